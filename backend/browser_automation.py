@@ -4,29 +4,177 @@ Uses Selenium WebDriver to automate browser interactions and record animations
 """
 import time
 import json
+import atexit
+import threading
 import os
+import base64
+import io
+import queue
+import shutil
+import subprocess
+import tempfile
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from PIL import Image
-import tempfile
+import websocket
+
+from browser_capture import generate_browser_capture_script
+
+# Optional: only used to shrink the finished GIF, with one thread per core
+GIFSICLE_PATH = shutil.which("gifsicle")
+
+# Flags the chart as re-rendering before an update is dispatched. The React app
+# replaces window.__chartReady when it commits the update and marks it done once
+# the transition ends; if nothing re-renders, the placeholder settles after the
+# next paint.
+MARK_CHART_PENDING_SCRIPT = """
+const pending = {done: false};
+window.__chartReady = pending;
+requestAnimationFrame(() => requestAnimationFrame(() => { pending.done = true; }));
+"""
+
+# Debug frame dumps are written on background threads so capture never blocks on disk I/O
+_frame_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="frame-writer")
+
+
+def _write_frame(path: str, data: bytes) -> str:
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def write_frame_async(path: str, data: bytes) -> Future:
+    """Queue frame bytes to be written to path; the future resolves to path"""
+    return _frame_writer.submit(_write_frame, path, data)
+
+
+# How a frame config reaches the chart, keyed by the method detected on the first frame.
+# Built once at import; apply_frame_config only %-formats the serialised config in.
+UPDATE_SCRIPT_TEMPLATES = {
+    "apply": "window.__applyFrameConfig(%s);",
+    "update": "window.updateChartConfig(%s);",
+    "event": "document.dispatchEvent(new CustomEvent('chartConfigUpdate', {detail: %s}));",
+}
+
+DETECT_UPDATE_METHOD_SCRIPT = """
+if (typeof window.__applyFrameConfig === 'function') return 'apply';
+if (typeof window.updateChartConfig === 'function') return 'update';
+return 'event';
+"""
+
+
+# Current chart size, compared against the cached clip after every frame
+CHART_SIZE_SCRIPT = """
+const wrapper = document.querySelector('.recharts-wrapper');
+if (!wrapper) return null;
+const r = wrapper.getBoundingClientRect();
+return [r.width, r.height];
+"""
+
+# Resolves true once the chart reports its render settled, or false after the timeout.
+# Polling happens in-page so the whole wait costs a single protocol round trip.
+# Background tabs may throttle requestAnimationFrame, so a timer enforces the deadline.
+WAIT_FOR_CHART_READY_SCRIPT = """
+const timeoutMs = %d;
+const deadline = performance.now() + timeoutMs;
+return new Promise(resolve => {
+    const timer = setTimeout(() => resolve(false), timeoutMs);
+    const check = () => {
+        const signal = window.__chartReady;
+        if (!signal || signal.done) { clearTimeout(timer); resolve(true); }
+        else if (performance.now() > deadline) resolve(false);
+        else requestAnimationFrame(check);
+    };
+    check();
+});
+"""
+
+
+class CdpSession:
+    """Minimal Chrome DevTools Protocol client talking to one page over its own WebSocket"""
+
+    def __init__(self, ws_url: str, timeout: float = 30):
+        self._ws = websocket.create_connection(ws_url, timeout=timeout, suppress_origin=True)
+        self._next_id = 0
+
+    @classmethod
+    def attach(cls, debugger_address: str, target_id: str) -> "CdpSession":
+        """Connect to the page target `target_id` of the Chrome listening on `debugger_address`"""
+        with urllib.request.urlopen(f"http://{debugger_address}/json/list", timeout=5) as response:
+            targets = json.load(response)
+        for target in targets:
+            if target.get("id") == target_id:
+                return cls(target["webSocketDebuggerUrl"])
+        raise Exception(f"No DevTools target {target_id} at {debugger_address}")
+
+    def send(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Send a command and block until its response arrives"""
+        self._next_id += 1
+        message_id = self._next_id
+        self._ws.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+        while True:
+            message = json.loads(self._ws.recv())
+            # Skip any protocol events; only our response carries the id
+            if message.get("id") != message_id:
+                continue
+            if "error" in message:
+                raise Exception(f"{method} failed: {message['error'].get('message')}")
+            return message.get("result", {})
+
+    def evaluate(self, script: str) -> Any:
+        """Run a script body (which may `return` a value or a promise) in the page"""
+        result = self.send("Runtime.evaluate", {
+            "expression": f"(() => {{{script}\n}})()",
+            "returnByValue": True,
+            "awaitPromise": True
+        })
+        if "exceptionDetails" in result:
+            raise Exception(result["exceptionDetails"].get("text", "Script failed"))
+        return result.get("result", {}).get("value")
+
+    def close(self):
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
 
 class BrowserAnimationRecorder:
-    def __init__(self, headless: bool = True, browser: str = "chrome"):
+    def __init__(self, headless: bool = True, browser: str = "chrome", debugger_address: Optional[str] = None):
         self.headless = headless
         self.browser = browser.lower()
+        self.debugger_address = debugger_address  # Attach to a running Chrome daemon instead of launching one
         self.driver = None
         self.recording_frames = []
         self.temp_dir = None
+        self._clip = None  # Chart bounding box, cached across frames
+        self._current_url = None  # Page the driver currently has loaded
+        self._update_method = None  # Key into UPDATE_SCRIPT_TEMPLATES, resolved per page load
+        self._verified = False  # Whether a frame has rendered a chart on this page
+        self._data_loaded = False  # Default dataset is loaded once per session
+        self._cdp: Optional[CdpSession] = None  # Direct DevTools channel for per-frame commands
         
     def setup_driver(self):
         """Initialize the WebDriver"""
-        if self.browser == "chrome":
+        if self.browser == "chrome" and self.debugger_address:
+            # The daemon already has its flags; give this recorder a tab of its own
+            options = ChromeOptions()
+            options.add_experimental_option("debuggerAddress", self.debugger_address)
+            self.driver = webdriver.Chrome(options=options)
+            self.driver.switch_to.new_window('tab')
+            self.connect_cdp()
+            return self.driver
+        elif self.browser == "chrome":
             options = ChromeOptions()
             if self.headless:
                 options.add_argument("--headless")
@@ -35,17 +183,37 @@ class BrowserAnimationRecorder:
             options.add_argument("--disable-gpu")
             options.add_argument("--window-size=1200,800")
             self.driver = webdriver.Chrome(options=options)
+            self.connect_cdp()
         else:
             options = FirefoxOptions()
             if self.headless:
                 options.add_argument("--headless")
             options.add_argument("--width=1200")
             options.add_argument("--height=800")
+            options.enable_bidi = True
             self.driver = webdriver.Firefox(options=options)
             
         self.driver.set_window_size(1200, 800)
         return self.driver
         
+    def connect_cdp(self):
+        """
+        Open a DevTools WebSocket straight to the page, so per-frame commands skip the
+        chromedriver HTTP hop. Selenium stays in charge of launching and navigating.
+        """
+        try:
+            debugger_address = self.driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+            self._cdp = CdpSession.attach(debugger_address, self.driver.current_window_handle)
+        except Exception as e:
+            print(f"Direct DevTools connection unavailable, using chromedriver: {e}")
+            self._cdp = None
+
+    def run_script(self, script: str) -> Any:
+        """Execute a script body in the page, over DevTools when connected"""
+        if self._cdp:
+            return self._cdp.evaluate(script)
+        return self.driver.execute_script(script)
+
     def navigate_to_chart(self, base_url: str):
         """Navigate to the chart application and wait for it to load"""
         try:
@@ -57,8 +225,16 @@ class BrowserAnimationRecorder:
             # Wait for React to load and chart to be ready
             wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
             
-            # Give extra time for React app to initialize
-            time.sleep(5)
+            # Wait for React to mount instead of sleeping a fixed amount
+            try:
+                WebDriverWait(self.driver, 10).until(lambda driver: driver.execute_script(
+                    "return document.querySelector('.recharts-wrapper, .view-controls') !== null"
+                ))
+            except TimeoutException:
+                print("React app did not mount in time")
+            
+            if not self._data_loaded:
+                self._data_loaded = self.load_default_data()
             
             # Check if we're in the right view mode by looking for chart elements
             try:
@@ -76,7 +252,10 @@ class BrowserAnimationRecorder:
                         chart_view_btn = self.driver.find_element(By.XPATH, 
                             "//button[contains(text(), 'Chart View')] | //button[contains(text(), 'Chart')]")
                         chart_view_btn.click()
-                        time.sleep(3)
+                        WebDriverWait(self.driver, 10).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, ".recharts-wrapper"))
+                        )
+                        self.wait_for_chart_ready()
                         print("Switched to chart view")
                         return True
                     except:
@@ -91,203 +270,485 @@ class BrowserAnimationRecorder:
             print(f"Failed to navigate to chart: {e}")
             return False
     
-    def apply_frame_config(self, frame_config: Dict[str, Any]):
-        """Apply a frame configuration to the chart by injecting JavaScript"""
-        try:
-            print(f"Applying frame config: {frame_config}")
-            
-            # First, ensure we have data loaded by triggering the default dataset
-            load_data_script = """
-            // Try to load default data if no data is present
+    def load_default_data(self, timeout: float = 10) -> bool:
+        """Make sure the app has a dataset loaded; only needed once per session"""
+        load_data_script = """
+        // Try to load default data if no data is present
+        if (!window.__dataReady) {
             if (typeof window.loadDefaultData === 'function') {
                 window.loadDefaultData();
             } else {
                 // Trigger click on "Generate Sample Data" or similar button
-                const generateBtn = document.querySelector('button:contains("Generate"), button:contains("Sample"), button:contains("Load")');
+                const generateBtn = Array.from(document.querySelectorAll('button'))
+                    .find(btn => /Generate|Sample|Load/.test(btn.textContent));
                 if (generateBtn) {
                     generateBtn.click();
                 }
             }
-            
-            // Wait a moment for data to load
-            setTimeout(() => {
-                console.log('Data loading initiated');
-            }, 1000);
-            """
-            
+        }
+        """
+        try:
             self.driver.execute_script(load_data_script)
-            time.sleep(2)
-            
-            # Now apply the chart configuration
-            config_script = f"""
-            try {{
-                console.log('Applying chart configuration:', {json.dumps(frame_config)});
-                
-                // Try multiple methods to update chart configuration
-                if (window.updateChartConfig) {{
-                    window.updateChartConfig({json.dumps(frame_config)});
-                }} else {{
-                    // Method 1: Direct state update via React DevTools if available
-                    if (window.__REACT_DEVTOOLS_GLOBAL_HOOK__) {{
-                        console.log('React DevTools available, attempting state update');
-                    }}
-                    
-                    // Method 2: Trigger form updates by finding and updating form controls
-                    const xColumnSelect = document.querySelector('select[name*="x"], select[id*="x"], select:contains("X-Axis")');
-                    const yColumnSelect = document.querySelector('select[name*="y"], select[id*="y"], select:contains("Y-Axis")');
-                    
-                    if (xColumnSelect && '{frame_config.get('x_column', '')}') {{
-                        xColumnSelect.value = '{frame_config.get('x_column', '')}';
-                        xColumnSelect.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                        console.log('Updated X column to:', '{frame_config.get('x_column', '')}');
-                    }}
-                    
-                    if (yColumnSelect && '{frame_config.get('y_column', '')}') {{
-                        yColumnSelect.value = '{frame_config.get('y_column', '')}';
-                        yColumnSelect.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                        console.log('Updated Y column to:', '{frame_config.get('y_column', '')}');
-                    }}
-                    
-                    // Method 3: Custom event dispatch
-                    const event = new CustomEvent('chartConfigUpdate', {{
-                        detail: {json.dumps(frame_config)}
-                    }});
-                    document.dispatchEvent(event);
-                    
-                    // Method 4: Try to find React fiber and update state directly
-                    const chartContainer = document.querySelector('.recharts-wrapper, .chart-container, [data-testid*="chart"]');
-                    if (chartContainer && chartContainer._reactInternalFiber) {{
-                        console.log('Found React fiber, attempting direct update');
-                        // This is a more advanced technique - may need adjustment
-                    }}
-                }}
-                
-                // Force a re-render by triggering window resize
-                setTimeout(() => {{
-                    window.dispatchEvent(new Event('resize'));
-                }}, 500);
-                
-                return 'Configuration applied successfully';
-            }} catch (error) {{
-                console.error('Failed to apply configuration:', error);
-                return 'Error: ' + error.message;
-            }}
-            """
+            WebDriverWait(self.driver, timeout, poll_frequency=0.05).until(
+                lambda driver: driver.execute_script("return window.__dataReady === true")
+            )
+            return True
+        except TimeoutException:
+            print(f"Data was not ready within {timeout}s")
+            return False
+        except Exception as e:
+            print(f"Failed to load default data: {e}")
+            return False
+    
+    def wait_for_chart_ready(self, timeout: float = 5) -> bool:
+        """Wait until the chart reports that its latest render has settled"""
+        if self._cdp:
+            if self._cdp.evaluate(WAIT_FOR_CHART_READY_SCRIPT % (timeout * 1000)):
+                return True
+            print("Chart did not report ready in time - continuing anyway")
+            return False
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.05).until(lambda driver: driver.execute_script(
+                "return !window.__chartReady || window.__chartReady.done === true"
+            ))
+            return True
+        except TimeoutException:
+            print("Chart did not report ready in time - continuing anyway")
+            return False
+
+    def apply_frame_config(self, frame_config: Dict[str, Any], serialized_config: Optional[str] = None):
+        """
+        Apply a frame configuration to the chart by injecting JavaScript.
+        serialized_config is json.dumps(frame_config), if the caller already has it.
+        """
+        try:
+            if serialized_config is None:
+                serialized_config = json.dumps(frame_config)
+            print(f"Applying frame config: {frame_config}")
             
-            result = self.driver.execute_script(config_script)
-            print(f"Configuration result: {result}")
+            # Resolve the update path once per page load, then only ever emit that branch
+            if self._update_method is None:
+                self._update_method = self.run_script(DETECT_UPDATE_METHOD_SCRIPT)
+                print(f"Updating chart via: {self._update_method}")
+
+            # Recharts reflows on prop changes, so no resize event is needed
+            update_script = UPDATE_SCRIPT_TEMPLATES[self._update_method] % serialized_config
+            self.run_script(MARK_CHART_PENDING_SCRIPT + update_script)
             
             # Wait for changes to take effect
-            time.sleep(3)
+            self.wait_for_chart_ready()
             
-            # Verify the configuration was applied
+            # Re-measure the clip rectangle only when the chart actually resized
+            if self._clip is not None:
+                chart_size = self.run_script(CHART_SIZE_SCRIPT)
+                if chart_size != [self._clip['width'], self._clip['height']]:
+                    self._clip = None
+            
+            if self._verified:
+                return True
+
+            # Verify the configuration was applied (first frame only)
             verify_script = """
             const charts = document.querySelectorAll('.recharts-wrapper, svg');
+            const wrapper = document.querySelector('.recharts-wrapper');
             return {
                 chartsFound: charts.length,
                 pageTitle: document.title,
-                hasData: document.querySelector('.recharts-wrapper') !== null
+                hasData: wrapper !== null,
+                chartSize: wrapper ? [wrapper.getBoundingClientRect().width, wrapper.getBoundingClientRect().height] : null
             };
             """
             
             verification = self.driver.execute_script(verify_script)
             print(f"Verification: {verification}")
             
-            return verification.get('chartsFound', 0) > 0
+            self._verified = verification.get('chartsFound', 0) > 0
+            return self._verified
             
         except Exception as e:
             print(f"Failed to apply frame config: {e}")
             return False
     
-    def capture_screenshot(self, output_path: str):
-        """Capture a screenshot of the current chart"""
+    def get_chart_clip(self) -> Optional[Dict[str, float]]:
+        """Measure the chart container so screenshots can be clipped to it"""
+        rect = self.driver.execute_script("""
+            const wrapper = document.querySelector('.recharts-wrapper');
+            if (!wrapper) return null;
+            const r = wrapper.getBoundingClientRect();
+            return {x: r.x + window.scrollX, y: r.y + window.scrollY, width: r.width, height: r.height};
+        """)
+        if not rect or not rect['width'] or not rect['height']:
+            return None
+        return {**rect, "scale": 1}
+
+    def grab_screenshot(self) -> bytes:
+        """Grab the chart area as JPEG bytes over the browser's native protocol"""
+        if self._clip is None:
+            self._clip = self.get_chart_clip()
+
+        if self.browser == "chrome":
+            # CDP skips the WebDriver screenshot endpoint and lets Chrome use its fast encoder.
+            # Frames end up palettised in a GIF, so a JPEG intermediate loses nothing visible
+            params = {
+                "format": "jpeg",
+                "quality": 85,
+                "optimizeForSpeed": True,
+                "captureBeyondViewport": False
+            }
+            if self._clip:
+                params["clip"] = self._clip
+            if self._cdp:
+                result = self._cdp.send("Page.captureScreenshot", params)
+            else:
+                result = self.driver.execute_cdp_cmd("Page.captureScreenshot", params)
+            return base64.b64decode(result["data"])
+
+        # Firefox has no CDP; WebDriver BiDi exposes the equivalent command
         try:
-            screenshot = self.driver.get_screenshot_as_png()
-            with open(output_path, 'wb') as f:
-                f.write(screenshot)
-            return True
+            clip = None
+            if self._clip:
+                clip = {"type": "box", "x": self._clip["x"], "y": self._clip["y"],
+                        "width": self._clip["width"], "height": self._clip["height"]}
+            data = self.driver.browsing_context.capture_screenshot(
+                self.driver.current_window_handle, origin="document",
+                format={"type": "image/jpeg", "quality": 0.85}, clip=clip
+            )
+            return base64.b64decode(data)
+        except Exception as e:
+            print(f"BiDi screenshot failed, falling back to WebDriver: {e}")
+            return self.driver.get_screenshot_as_png()
+
+    def capture_screenshot(self) -> Optional[bytes]:
+        """Capture a screenshot of the current chart, kept in memory"""
+        try:
+            return self.grab_screenshot()
         except Exception as e:
             print(f"Failed to capture screenshot: {e}")
-            return False
+            return None
     
-    def create_gif_from_frames(self, frame_paths: List[str], output_path: str, frame_delay: int = 1000):
-        """Create a GIF from captured frame images"""
+    def capture_frames_in_browser(self, base_url: str, frames_config: List[Dict[str, Any]],
+                                  animation_config: Dict[str, Any]) -> Optional[List[bytes]]:
+        """
+        Drive and capture every frame inside the page with a single script call.
+        Returns None if the page cannot capture on its own (e.g. html2canvas is missing).
+        """
+        if not self.warm_up(base_url):
+            raise Exception("Failed to navigate to chart")
+
         try:
-            images = []
-            for frame_path in frame_paths:
-                if os.path.exists(frame_path):
-                    img = Image.open(frame_path)
-                    images.append(img)
-            
-            if images:
-                # Save as GIF with loop
-                images[0].save(
-                    output_path,
-                    save_all=True,
-                    append_images=images[1:],
-                    duration=frame_delay,
-                    loop=0,  # Infinite loop
-                    optimize=True
-                )
-                return output_path
-            else:
+            script = generate_browser_capture_script(frames_config, animation_config)
+            # Leave room for the settle delays the capture script waits between frames
+            self.driver.set_script_timeout(30 + 2 * len(frames_config))
+            result = self.driver.execute_async_script(script + """
+                const done = arguments[arguments.length - 1];
+                window.captureFrames().then(done, error => done({error: error.message}));
+            """)
+        except Exception as e:
+            print(f"In-browser capture failed: {e}")
+            return None
+
+        if not isinstance(result, list):
+            print(f"In-browser capture unavailable: {result}")
+            return None
+        return [base64.b64decode(frame.split(',', 1)[-1]) for frame in result]
+
+    def create_gif_from_frames(self, frame_images: List[bytes], output_path: str, frame_delay: int = 1000):
+        """Create a GIF from captured, encoded frame images"""
+        try:
+            frame_images = [frame for frame in frame_images if frame]
+            if not frame_images:
                 raise Exception("No valid frames found")
+
+            with Image.open(io.BytesIO(frame_images[0])) as first:
+                size = first.size
+
+            def decoded_frames():
+                # Decode on demand; Pillow still holds every appended frame while saving
+                for frame in frame_images:
+                    with Image.open(io.BytesIO(frame)) as img:
+                        img = img.convert("RGB")
+                        if img.size != size:
+                            img = img.resize(size)
+                        yield img
+
+            frames = decoded_frames()
+            
+            # Save as GIF with infinite loop; Pillow only optimises when gifsicle won't
+            next(frames).save(
+                output_path,
+                save_all=True,
+                append_images=frames,
+                duration=frame_delay,
+                loop=0,
+                optimize=GIFSICLE_PATH is None
+            )
+
+            if GIFSICLE_PATH:
+                try:
+                    subprocess.run(
+                        [GIFSICLE_PATH, "--batch", "-O3", "--lossy=80", f"-j{os.cpu_count() or 1}", output_path],
+                        check=True,
+                        capture_output=True
+                    )
+                except (subprocess.CalledProcessError, OSError) as e:
+                    print(f"gifsicle optimisation skipped: {e}")
+
+            return output_path
                 
         except Exception as e:
             print(f"Failed to create GIF: {e}")
             raise
     
-    def record_animation(self, base_url: str, frames_config: List[Dict[str, Any]], output_path: str, animation_config: Dict[str, Any]):
-        """Record a complete animation sequence"""
-        try:
-            # Setup driver
+    def warm_up(self, base_url: str) -> bool:
+        """Start the browser and load the chart page unless already done for this URL"""
+        if self.driver is None:
             self.setup_driver()
-            
-            # Navigate to chart
-            if not self.navigate_to_chart(base_url):
-                raise Exception("Failed to navigate to chart")
-            
-            # Create temporary directory for frames
-            with tempfile.TemporaryDirectory() as temp_dir:
-                frame_paths = []
-                
-                # Capture frames
-                for i, frame_config in enumerate(frames_config):
-                    print(f"Capturing frame {i+1}/{len(frames_config)}")
-                    
-                    # Apply frame configuration
-                    if not self.apply_frame_config(frame_config):
-                        print(f"Warning: Failed to apply frame config {i}")
-                    
-                    # Capture screenshot
-                    frame_path = os.path.join(temp_dir, f"frame_{i:03d}.png")
-                    if self.capture_screenshot(frame_path):
-                        frame_paths.append(frame_path)
-                    else:
-                        print(f"Warning: Failed to capture frame {i}")
-                
-                # Create GIF from frames
-                if frame_paths:
-                    frame_delay = animation_config.get('frameDelay', 1000)
-                    return self.create_gif_from_frames(frame_paths, output_path, frame_delay)
-                else:
-                    raise Exception("No frames were captured successfully")
-                    
+        if self._current_url == base_url:
+            return True
+        # Per-page state: the new page needs its data loaded and chart measured again
+        self._update_method = None
+        self._verified = False
+        self._data_loaded = False
+        self._clip = None
+        if not self.navigate_to_chart(base_url):
+            return False
+        self._current_url = base_url
+        return True
+
+    def capture_frame(self, base_url: str, frame_config: Dict[str, Any],
+                      serialized_config: Optional[str] = None) -> Optional[bytes]:
+        """Apply a single frame configuration and capture it"""
+        if not self.warm_up(base_url):
+            raise Exception("Failed to navigate to chart")
+
+        if not self.apply_frame_config(frame_config, serialized_config):
+            print(f"Warning: Failed to apply frame config {frame_config}")
+
+        return self.capture_screenshot()
+
+    def close(self):
+        """Shut down the browser"""
+        if self._cdp:
+            self._cdp.close()
+        self._cdp = None
+        if self.driver:
+            if self.debugger_address:
+                # Only close our tab; the daemon browser outlives the recorder
+                try:
+                    self.driver.close()
+                except Exception as e:
+                    print(f"Failed to close recorder tab: {e}")
+            self.driver.quit()
+        self.driver = None
+        self._current_url = None
+
+    def record_animation(self, base_url: str, frames_config: List[Dict[str, Any]], output_path: str,
+                         animation_config: Dict[str, Any], save_to_disk: bool = False):
+        """
+        Record a complete animation sequence using only this recorder's browser.
+        The browser stays open for later recordings; call close() when done.
+        """
+        return BrowserPool(recorders=[self]).record_animation(
+            base_url, frames_config, output_path, animation_config, save_to_disk=save_to_disk
+        )
+
+
+class BrowserPool:
+    """
+    A fixed set of pre-launched browsers shared by frame-capture workers.
+    Chromium serialises screenshots within one browser, so frames are
+    sharded across several browsers to capture them concurrently.
+    """
+
+    def __init__(self, size: Optional[int] = None, headless: bool = True, browser: str = "chrome",
+                 recorders: Optional[List[BrowserAnimationRecorder]] = None,
+                 debugger_address: Optional[str] = None):
+        if recorders is None:
+            size = size or min(os.cpu_count() or 1, 4)
+            recorders = [BrowserAnimationRecorder(headless=headless, browser=browser, debugger_address=debugger_address)
+                         for _ in range(size)]
+            # Launch the browsers concurrently; each startup is mostly idle waiting
+            try:
+                with ThreadPoolExecutor(max_workers=size) as executor:
+                    list(executor.map(lambda recorder: recorder.setup_driver(), recorders))
+            except Exception:
+                # Don't leak the browsers that did start
+                for recorder in recorders:
+                    try:
+                        recorder.close()
+                    except Exception as e:
+                        print(f"Failed to close browser: {e}")
+                raise
+
+        self.recorders = recorders
+        self.size = len(recorders)
+        self._available = queue.Queue()
+        for recorder in recorders:
+            self._available.put(recorder)
+
+    @contextmanager
+    def rent(self):
+        """Borrow a recorder for the duration of a with-block"""
+        recorder = self._available.get()
+        try:
+            yield recorder
+        finally:
+            self._available.put(recorder)
+
+    def _capture(self, base_url: str, index: int, frame_config: Dict[str, Any], serialized_config: str):
+        with self.rent() as recorder:
+            print(f"Capturing frame {index+1}")
+            frame = recorder.capture_frame(base_url, frame_config, serialized_config)
+            if frame:
+                return index, frame
+            print(f"Warning: Failed to capture frame {index}")
+            return index, None
+
+    def _capture_in_browser(self, base_url: str, frames_config: List[Dict[str, Any]],
+                            animation_config: Dict[str, Any]) -> List[bytes]:
+        with self.rent() as recorder:
+            return recorder.capture_frames_in_browser(base_url, frames_config, animation_config) or []
+
+    def _capture_in_parallel(self, base_url: str, frames_config: List[Dict[str, Any]]) -> List[bytes]:
+        # Serialise each config once up front rather than inside the per-frame script build
+        serialized = [json.dumps(frame_config) for frame_config in frames_config]
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [
+                executor.submit(self._capture, base_url, i, frame_config, serialized[i])
+                for i, frame_config in enumerate(frames_config)
+            ]
+            results = sorted(future.result() for future in futures)
+
+        return [frame for _, frame in results if frame]
+
+    def record_animation(self, base_url: str, frames_config: List[Dict[str, Any]], output_path: str,
+                         animation_config: Dict[str, Any], save_to_disk: bool = False):
+        """
+        Record a complete animation sequence. Frames are captured in one in-page
+        script call when the page supports it, otherwise in parallel across the pool.
+        Frames stay in memory; save_to_disk also writes them next to output_path for debugging.
+        """
+        try:
+            frames = []
+            if animation_config.get('inBrowserCapture', True):
+                frames = self._capture_in_browser(base_url, frames_config, animation_config)
+            if not frames:
+                frames = self._capture_in_parallel(base_url, frames_config)
+
+            if save_to_disk:
+                frames_dir = Path(f"{output_path}_frames")
+                frames_dir.mkdir(parents=True, exist_ok=True)
+                writes = []
+                for i, frame in enumerate(frames):
+                    extension = "png" if frame.startswith(b"\x89PNG") else "jpg"
+                    writes.append(write_frame_async(str(frames_dir / f"frame_{i:03d}.{extension}"), frame))
+                for write in writes:
+                    write.result()
+
+            # Create GIF from frames
+            if frames:
+                frame_delay = animation_config.get('frameDelay', 1000)
+                return self.recorders[0].create_gif_from_frames(frames, output_path, frame_delay)
+            else:
+                raise Exception("No frames were captured successfully")
+
         except Exception as e:
             print(f"Animation recording failed: {e}")
             raise
-        finally:
-            if self.driver:
-                self.driver.quit()
+
+    def close(self):
+        """Shut down every browser in the pool"""
+        for recorder in self.recorders:
+            recorder.close()
+
+
+# Executables tried, in order, when launching the Chrome daemon
+CHROME_BINARIES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+
+_chrome_daemon: Optional[subprocess.Popen] = None
+
+
+def _stop_chrome_daemon(process: subprocess.Popen, profile_dir: str):
+    """Terminate the Chrome daemon and remove its temporary profile"""
+    process.terminate()
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+def start_chrome_daemon(port: int = 9222, headless: bool = True) -> str:
+    """
+    Launch one long-lived Chrome with remote debugging enabled and return its
+    debugger address. Recorders attach to it rather than paying a cold start each.
+    """
+    global _chrome_daemon
+    address = f"127.0.0.1:{port}"
+    if _chrome_daemon is not None and _chrome_daemon.poll() is None:
+        return address
+
+    binary = next((path for path in map(shutil.which, CHROME_BINARIES) if path), None)
+    if binary is None:
+        raise Exception("Chrome executable not found")
+
+    profile_dir = tempfile.mkdtemp(prefix='chrome-daemon-')
+    args = [
+        binary,
+        f"--remote-debugging-port={port}",
+        f"--user-data-dir={profile_dir}",
+        "--no-sandbox",
+        "--disable-dev-shm-usage",
+        "--disable-gpu",
+        "--window-size=1200,800"
+    ]
+    if headless:
+        args.append("--headless=new")
+    try:
+        _chrome_daemon = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        raise
+    atexit.register(_stop_chrome_daemon, _chrome_daemon, profile_dir)
+
+    # Wait for the DevTools endpoint to come up
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://{address}/json/version", timeout=1):
+                return address
+        except OSError:
+            time.sleep(0.1)
+    raise Exception(f"Chrome daemon did not start listening on {address}")
+
+
+# Browsers are expensive to start, so one pool is shared by every animation request
+_shared_pool: Optional[BrowserPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool() -> BrowserPool:
+    """Return the process-wide browser pool, launching it on first use"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            # Set CHROME_DEBUG_PORT to share a single persistent Chrome between all recorders
+            debug_port = os.environ.get("CHROME_DEBUG_PORT")
+            debugger_address = start_chrome_daemon(int(debug_port)) if debug_port else None
+            # Tabs of one browser capture one at a time, so a shared daemon gets a single recorder
+            _shared_pool = BrowserPool(size=1 if debugger_address else None, headless=True,
+                                       debugger_address=debugger_address)
+            atexit.register(_shared_pool.close)
+        return _shared_pool
+
 
 def create_animation_from_config(base_url: str, frames: List[Dict[str, Any]], output_path: str, animation_config: Dict[str, Any]) -> str:
     """
     Main function to create animation from configuration
     """
     try:
-        recorder = BrowserAnimationRecorder(headless=True)
-        result_path = recorder.record_animation(base_url, frames, output_path, animation_config)
-        return result_path
+        return get_shared_pool().record_animation(base_url, frames, output_path, animation_config)
     except Exception as e:
         print(f"Failed to create animation: {e}")
         raise
@@ -1,26 +1,39 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ConfigDict
 from typing import List, Dict, Any, Optional
 import polars as pl
+import numpy as np
 import json
+import orjson
 import uvicorn
 from datetime import datetime
-import random
 import io
 import subprocess
 import asyncio
+import multiprocessing
 import os
 import base64
+import tempfile
+import secrets
+import time
 from pathlib import Path
 from PIL import Image
+from cachetools import TTLCache
 
 # Global variables
 current_dataframe = None
-recording_sessions = {}  # Store browser automation recording sessions
+_RNG = np.random.default_rng(0)  # Shared, seeded generator so sample datasets are reproducible
+recording_sessions = TTLCache(maxsize=1024, ttl=300)  # Browser automation recording sessions, expired after 5 minutes
 
-app = FastAPI(title="Data Visualizer API", version="1.0.0")
+# orjson serialises the large row lists returned by the data endpoints much faster than stdlib json
+app = FastAPI(title="Data Visualizer API", version="1.0.0", default_response_class=ORJSONResponse)
+
+# Compress JSON responses; row lists repeat every key and shrink >10x
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # Configure CORS
 app.add_middleware(
@@ -39,6 +52,8 @@ app.add_middleware(
 
 # Data models
 class DataPoint(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     x: float
     y: float
     category: Optional[str] = None
@@ -46,6 +61,8 @@ class DataPoint(BaseModel):
     color: Optional[str] = None
 
 class ChartConfig(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True, str_strip_whitespace=True)
+    
     chart_type: str  # 'scatter', 'line', 'bar'
     x_column: str
     y_column: str
@@ -53,138 +70,368 @@ class ChartConfig(BaseModel):
     size_column: Optional[str] = None
     color_column: Optional[str] = None
 
+# Output field for each ChartConfig column attribute, in response order
+CHART_FIELDS = (
+    ("x", "x_column"),
+    ("y", "y_column"),
+    ("category", "category_column"),
+    ("size", "size_column"),
+    ("color", "color_column"),
+)
+
+# Category pools for the sample datasets, built once at import
+COMPANIES = np.array(["TechCorp", "DataInc", "CloudSys", "AILabs", "DevOps", "SecureNet", "WebFlow", "AppForge"])
+DEPARTMENTS = np.array(["Engineering", "Sales", "Marketing", "HR", "Finance", "Operations", "Support", "Research"])
+REGIONS = np.array(["North America", "Europe", "Asia Pacific", "Latin America", "Middle East", "Africa"])
+PRODUCT_CATEGORIES = np.array(["Software", "Hardware", "Services", "Consulting", "Support", "Training"])
+YEARS = np.array([2023, 2024, 2025])
+SALES_REGIONS = np.array(["North", "South", "East", "West", "Central"])
+SALES_PRODUCTS = np.array(["Product A", "Product B", "Product C", "Product D", "Product E"])
+CUSTOMER_TYPES = np.array(["Enterprise", "SMB", "Individual"])
+SALES_CHANNELS = np.array(["Direct", "Partner", "Online"])
+EMPLOYEE_DEPARTMENTS = DEPARTMENTS[:6]
+POSITIONS = np.array(["Junior", "Mid-level", "Senior", "Lead", "Manager", "Director"])
+
+def _pick(options: np.ndarray, n: int) -> np.ndarray:
+    """Draw n values from options by indexing with random positions"""
+    return options[_RNG.integers(0, len(options), n)]
+
 # Sample data generation
-def generate_sample_data(num_points: int = 500) -> pl.LazyFrame:
+def generate_sample_data(num_points: int = 500) -> pl.DataFrame:
     """Generate comprehensive sample data simulating real-world scenarios"""
-    data = []
+    n = num_points
     
-    # Categories for different data scenarios
-    companies = ["TechCorp", "DataInc", "CloudSys", "AILabs", "DevOps", "SecureNet", "WebFlow", "AppForge"]
-    departments = ["Engineering", "Sales", "Marketing", "HR", "Finance", "Operations", "Support", "Research"]
-    regions = ["North America", "Europe", "Asia Pacific", "Latin America", "Middle East", "Africa"]
-    product_categories = ["Software", "Hardware", "Services", "Consulting", "Support", "Training"]
+    # Generate realistic business data, one column at a time. Measures are stored
+    # as Float64 at full precision; rounding for display is left to the client
+    # Base metrics with some correlation
+    revenue = _RNG.uniform(10000, 1000000, n)
+    profit_margin = _RNG.uniform(0.05, 0.30, n)
+    profit = revenue * profit_margin
     
-    # Generate realistic business data
-    for i in range(num_points):
-        # Base metrics with some correlation
-        revenue = random.uniform(10000, 1000000)
-        profit_margin = random.uniform(0.05, 0.30)
-        profit = revenue * profit_margin
-        
-        # Employee and performance metrics
-        employees = random.randint(10, 1000)
-        productivity = random.uniform(50, 150) + (employees / 20)  # Slightly correlated with team size
-        
-        # Time-based data
-        quarter = random.choice([1, 2, 3, 4])
-        year = random.choice([2023, 2024, 2025])
-        
-        # Customer metrics
-        customers = random.randint(100, 10000)
-        satisfaction = random.uniform(1, 10)
-        retention_rate = random.uniform(0.60, 0.95)
-        
-        # Market data
-        market_share = random.uniform(0.01, 0.25)
-        growth_rate = random.uniform(-0.10, 0.50)
-        
-        data.append({
-            "id": i,
-            "company": random.choice(companies),
-            "department": random.choice(departments),
-            "region": random.choice(regions),
-            "product_category": random.choice(product_categories),
-            
-            # Financial metrics
-            "revenue": round(revenue, 2),
-            "profit": round(profit, 2),
-            "profit_margin": round(profit_margin * 100, 2),  # As percentage
-            
-            # Operational metrics
-            "employees": employees,
-            "productivity_score": round(productivity, 1),
-            "customers": customers,
-            "customer_satisfaction": round(satisfaction, 1),
-            "retention_rate": round(retention_rate * 100, 1),  # As percentage
-            
-            # Market metrics
-            "market_share": round(market_share * 100, 2),  # As percentage
-            "growth_rate": round(growth_rate * 100, 1),    # As percentage
-            
-            # Time dimensions
-            "year": year,
-            "quarter": quarter,
-            "quarter_year": f"Q{quarter} {year}",
-            
-            # Additional dimensions for visualization
-            "size_metric": round(revenue / 1000, 1),  # Revenue in thousands for bubble size
-            "efficiency": round((profit / employees) if employees > 0 else 0, 2),
-            "revenue_per_customer": round((revenue / customers) if customers > 0 else 0, 2),
-            
-            # Categorical data for grouping
-            "performance_tier": "High" if profit_margin > 0.20 else "Medium" if profit_margin > 0.10 else "Low",
-            "company_size": "Large" if employees > 500 else "Medium" if employees > 100 else "Small",
-            "region_category": "Developed" if random.choice([True, False]) else "Emerging",
-            
-            # Additional numeric fields for variety
-            "marketing_spend": round(revenue * random.uniform(0.05, 0.15), 2),
-            "rd_spend": round(revenue * random.uniform(0.02, 0.12), 2),
-            "employee_satisfaction": round(random.uniform(6, 10), 1),
-            "innovation_index": round(random.uniform(1, 100), 1),
-            
-            # Timestamp
-            "last_updated": datetime.now().isoformat(),
-        })
+    # Employee and performance metrics
+    employees = _RNG.integers(10, 1001, n)
+    productivity = (_RNG.uniform(50, 150, n) + (employees / 20))  # Slightly correlated with team size
     
-    return pl.LazyFrame(data)
+    # Time-based data
+    quarter = _RNG.integers(1, 5, n)
+    year = _pick(YEARS, n)
+    
+    # Customer metrics
+    customers = _RNG.integers(100, 10001, n)
+    satisfaction = _RNG.uniform(1, 10, n)
+    retention_rate = _RNG.uniform(0.60, 0.95, n)
+    
+    # Market data
+    market_share = _RNG.uniform(0.01, 0.25, n)
+    growth_rate = _RNG.uniform(-0.10, 0.50, n)
+    
+    data = {
+        "id": np.arange(n),
+        "company": _pick(COMPANIES, n),
+        "department": _pick(DEPARTMENTS, n),
+        "region": _pick(REGIONS, n),
+        "product_category": _pick(PRODUCT_CATEGORIES, n),
+        
+        # Financial metrics
+        "revenue": revenue,
+        "profit": profit,
+        "profit_margin": profit_margin,  # As a fraction
+        
+        # Operational metrics
+        "employees": employees,
+        "productivity_score": productivity,
+        "customers": customers,
+        "customer_satisfaction": satisfaction,
+        "retention_rate": retention_rate,  # As a fraction
+        
+        # Market metrics
+        "market_share": market_share,  # As a fraction
+        "growth_rate": growth_rate,    # As a fraction
+        
+        # Time dimensions
+        "year": year,
+        "quarter": quarter,
+        "quarter_year": np.char.add(np.char.add("Q", quarter.astype(str)), np.char.add(" ", year.astype(str))),
+        
+        # Additional dimensions for visualization
+        "size_metric": revenue / 1000,  # Revenue in thousands for bubble size
+        "efficiency": np.where(employees > 0, profit / employees, 0),
+        "revenue_per_customer": np.where(customers > 0, revenue / customers, 0),
+        
+        # Categorical data for grouping
+        "performance_tier": np.select([profit_margin > 0.20, profit_margin > 0.10], ["High", "Medium"], "Low"),
+        "company_size": np.select([employees > 500, employees > 100], ["Large", "Medium"], "Small"),
+        "region_category": np.where(_RNG.integers(0, 2, n, dtype=bool), "Developed", "Emerging"),
+        
+        # Additional numeric fields for variety
+        "marketing_spend": revenue * _RNG.uniform(0.05, 0.15, n),
+        "rd_spend": revenue * _RNG.uniform(0.02, 0.12, n),
+        "employee_satisfaction": _RNG.uniform(6, 10, n),
+        "innovation_index": _RNG.uniform(1, 100, n),
+    }
+    
+    return pl.DataFrame(data)
+
+def _server_run_id() -> int:
+    """Pid identifying this server run: uvicorn's supervisor for worker processes, else this process"""
+    parent = multiprocessing.parent_process()
+    return parent.pid if parent is not None else os.getpid()
+
+# The current dataset is mirrored to an Arrow IPC file in shared memory, so every
+# uvicorn worker memory-maps the same bytes and sees uploads made through any worker.
+# The file is named per server run so restarts and other instances start fresh
+SHARED_DATA_PATH = Path(os.environ.get(
+    "SHARED_DATA_PATH",
+    os.path.join(
+        "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+        f"data_visualizer-{_server_run_id()}.arrow"
+    )
+))
+_shared_data_version = None  # (inode, mtime) of the shared file current_data came from
+data_generated_at = None  # When current_data was produced, sent once per response rather than per row
+
+def _shared_file_version():
+    try:
+        stat = SHARED_DATA_PATH.stat()
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+def reset_data_state():
+    """Drop stale caches and rebuild column metadata for a newly loaded current_data"""
+    global data_generated_at
+    invalidate_data_cache()
+    build_column_metadata()
+    data_generated_at = datetime.now().isoformat()
+
+def write_shared_data(df: pl.DataFrame):
+    """Write df to the shared Arrow file; returns the file's version, or None if it couldn't be written"""
+    # Write beside the target then rename, so readers never map a half-written file
+    tmp_path = SHARED_DATA_PATH.with_name(f"{SHARED_DATA_PATH.name}.{os.getpid()}.tmp")
+    try:
+        df.write_ipc(tmp_path)
+        os.replace(tmp_path, SHARED_DATA_PATH)
+        return _shared_file_version()
+    except Exception as e:
+        # Includes Polars errors for dtypes IPC can't hold; this worker keeps serving df
+        print(f"Could not share data with other workers: {e}")
+        tmp_path.unlink(missing_ok=True)
+        return None
+
+def remove_shared_data():
+    """Delete the shared Arrow file when the server shuts down"""
+    SHARED_DATA_PATH.unlink(missing_ok=True)
+
+# Uvicorn's worker processes skip atexit handlers, so clean up on application shutdown
+app.add_event_handler("shutdown", remove_shared_data)
+
+# Serialises shared-file writes so they land in the order the datasets were loaded;
+# created on first use so it belongs to the server's event loop
+_publish_lock = None
+
+async def publish_current_data():
+    """Share a newly loaded current_data with the other workers and drop stale caches"""
+    global _shared_data_version, _publish_lock
+    reset_data_state()
+    df = current_data
+    if _publish_lock is None:
+        _publish_lock = asyncio.Lock()
+    async with _publish_lock:
+        # The IPC write copies the whole frame, so it runs off the event loop
+        version = await run_in_threadpool(write_shared_data, df)
+    if version is not None:
+        _shared_data_version = version
+
+def refresh_current_data():
+    """Pick up data published by another worker since this one last looked"""
+    global current_data, _shared_data_version, data_generated_at
+    version = _shared_file_version()
+    if version is None or version == _shared_data_version:
+        return
+    current_data = pl.read_ipc(SHARED_DATA_PATH, memory_map=True)
+    _shared_data_version = version
+    data_generated_at = datetime.fromtimestamp(version[1] / 1e9).isoformat()
+    invalidate_data_cache()
+    build_column_metadata()
 
 # In-memory data storage (replace with actual data source)
-current_data = generate_sample_data()
+current_data = None
+
+# Schema and serialised responses for current_data; cleared whenever it changes
+_cache = {"schema": None, "columns": None, "sample_bytes": None, "table_bytes": None, "table_arrow": None}
+
+def get_schema() -> pl.Schema:
+    """Schema of current_data, resolved once per dataset"""
+    if _cache["schema"] is None:
+        _cache["schema"] = current_data.schema
+    return _cache["schema"]
+
+def invalidate_data_cache():
+    """Forget cached results after current_data has been replaced"""
+    for key in _cache:
+        _cache[key] = None
+
+def build_column_metadata():
+    """Precompute the schema and /data/columns payload when a dataset is loaded"""
+    schema = current_data.schema
+    columns_info = [
+        {"name": name, "type": str(dtype), "is_numeric": dtype.is_numeric()}
+        for name, dtype in schema.items()
+    ]
+    
+    # First and second columns are the chart defaults
+    column_names = schema.names()
+    first_column = column_names[0] if column_names else "x"
+    second_column = column_names[1] if len(column_names) > 1 else column_names[0] if column_names else "y"
+    
+    _cache["schema"] = schema
+    _cache["columns"] = {
+        "columns": columns_info,
+        "first_column": first_column,
+        "second_column": second_column
+    }
+
+# Reuse data another worker has already published, otherwise start from the sample set
+refresh_current_data()
+if current_data is None:
+    current_data = generate_sample_data()
+    reset_data_state()
+    _shared_data_version = write_shared_data(current_data)
 
-@app.get("/")
+@app.middleware("http")
+async def sync_shared_data(request, call_next):
+    if request.url.path.startswith("/data"):
+        refresh_current_data()
+    return await call_next(request)
+
+
+# Constant responses are serialised once at import. Each request still gets a fresh
+# Response, since middleware appends headers to the instance it sends
+STATIC_CACHE_HEADERS = {"Cache-Control": "public, max-age=3600"}
+ROOT_BYTES = orjson.dumps({"message": "Data Visualizer API is running"})
+
+@app.get("/", response_model=None)
 async def root():
-    return {"message": "Data Visualizer API is running"}
+    return Response(ROOT_BYTES, media_type="application/json", headers=STATIC_CACHE_HEADERS)
+
+# Serialising rows is the heavy part of the read endpoints; these run in the
+# threadpool so a large dataset doesn't stall the event loop
+def _rows_json(df: pl.DataFrame, **extra) -> bytes:
+    return orjson.dumps({"data": df.to_dicts(), **extra})
+
+def _columns_json(df: pl.DataFrame, **extra) -> bytes:
+    return orjson.dumps({"data": df.to_dict(as_series=False), **extra})
+
+def _arrow_stream(df: pl.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    df.write_ipc_stream(buffer, compression="lz4")
+    return buffer.getvalue()
+
+def _iter_rows_json(df: pl.DataFrame, slice_size: int = 10_000):
+    """Yield {"data": [...], "total_rows": n} in pieces, one slice of rows at a time"""
+    yield b'{"data":['
+    first = True
+    for chunk in df.iter_slices(slice_size):
+        if chunk.is_empty():
+            continue
+        if not first:
+            yield b","
+        yield orjson.dumps(chunk.to_dicts())[1:-1]
+        first = False
+    yield b'],"total_rows":%d}' % df.height
+
+def _chart_json(chart_df: pl.DataFrame, columnar: bool) -> bytes:
+    if columnar:
+        return orjson.dumps(chart_df.to_dict(as_series=False))
+    return chart_df.write_json().encode()
+
+def _read_csv_upload(source) -> pl.DataFrame:
+    """
+    Parse an uploaded CSV file object as UTF-8, re-reading it as Latin-1 if that fails.
+    Polars reads the spooled upload file directly, so UTF-8 files are never copied.
+    """
+    options = {"low_memory": False, "rechunk": True, "try_parse_dates": True}
+    try:
+        return pl.read_csv(source, encoding="utf8", **options)
+    except Exception as utf8_error:
+        source.seek(0)
+        latin1 = source.read().decode("latin-1").encode()
+        try:
+            return pl.read_csv(io.BytesIO(latin1), **options)
+        except Exception:
+            raise utf8_error
 
-@app.get("/data/sample")
+@app.get("/data/sample", response_model=None)
 async def get_sample_data():
     """Get sample data for visualization"""
-    df = current_data.collect()
-    return {"data": df.to_dicts()}
-
-@app.get("/data/table")
-async def get_table_data(limit: Optional[int] = None):
-    """Get data in table format for AG Grid"""
-    df = current_data
+    content = _cache["sample_bytes"]
+    if content is None:
+        df = current_data
+        content = await run_in_threadpool(_rows_json, df, generated_at=data_generated_at)
+        # Only cache if no upload replaced the dataset while serialising
+        if current_data is df:
+            _cache["sample_bytes"] = content
+    return Response(content, media_type="application/json")
+
+@app.get("/data/table", response_model=None)
+async def get_table_data(limit: Optional[int] = None, precision: Optional[int] = None, columnar: bool = False):
+    """
+    Get data in table format for AG Grid.
+    With precision set, float columns are rounded to that many decimals for display.
+    With columnar=true the data is returned as one list per column instead of one dict per row.
+    """
+    # The full table is requested on every view switch, so its response is cached
+    cached = _cache["table_bytes"]
+    if not limit and cached is not None and cached[0] == (precision, columnar):
+        return Response(cached[1], media_type="application/json")
+    
+    df = result = current_data
     
     if limit:
-        df = df.limit(limit)
+        result = result.head(limit)
     
-    result = df.collect()
-    return {
-        "data": result.to_dicts(),
-        "columns": list(result.columns),
-        "total_rows": len(result)
-    }
-
-@app.post("/data/chart")
-async def get_chart_data(config: ChartConfig):
-    """Get data formatted for charts based on configuration"""
+    if precision is not None:
+        # Any float32 columns (e.g. from uploads) are widened first so the rounded numbers print cleanly
+        result = result.with_columns(pl.col(pl.Float32, pl.Float64).cast(pl.Float64).round(precision))
+    
+    total_rows = result.height
+    serialise = _columns_json if columnar else _rows_json
+    content = await run_in_threadpool(
+        serialise, result, columns=result.columns, total_rows=total_rows, generated_at=data_generated_at
+    )
+    if not limit and current_data is df:
+        _cache["table_bytes"] = ((precision, columnar), content)
+    return Response(content, media_type="application/json")
+
+@app.get("/data/table.arrow")
+async def get_table_arrow(limit: Optional[int] = None):
+    """Get table data as an LZ4-compressed Arrow IPC stream (read with apache-arrow's RecordBatchStreamReader)"""
+    if not limit and _cache["table_arrow"] is not None:
+        return Response(_cache["table_arrow"], media_type="application/vnd.apache.arrow.stream")
+    
+    df = current_data
+    result = df.head(limit) if limit else df
+    
+    content = await run_in_threadpool(_arrow_stream, result)
+    if not limit and current_data is df:
+        _cache["table_arrow"] = content
+    return Response(content, media_type="application/vnd.apache.arrow.stream")
+
+@app.post("/data/chart", response_model=None)
+async def get_chart_data(config: ChartConfig, columnar: bool = False):
+    """
+    Get data formatted for charts based on configuration.
+    With columnar=true the data is returned as one list per field instead of one dict per point.
+    """
     try:
-        df = current_data
-        
-        # Select required columns
-        required_columns = [config.x_column, config.y_column]
-        if config.category_column:
-            required_columns.append(config.category_column)
-        if config.size_column:
-            required_columns.append(config.size_column)
-        if config.color_column:
-            required_columns.append(config.color_column)
+        # Resolve the config into (field, source column) pairs once, so building
+        # the points needs no per-row checks for which optional fields are set
+        mapping = [(field, getattr(config, attr)) for field, attr in CHART_FIELDS if getattr(config, attr)]
+        required_columns = list(dict.fromkeys(column for _, column in mapping))
         
         # Check if columns exist
-        sample_df = df.limit(1).collect()
-        available_columns = list(sample_df.schema.keys())
-        missing_columns = [col for col in required_columns if col not in available_columns]
+        schema = get_schema()
+        missing_columns = [col for col in required_columns if col not in schema]
         
         if missing_columns:
             raise HTTPException(
@@ -192,32 +439,21 @@ async def get_chart_data(config: ChartConfig):
                 detail=f"Missing columns: {missing_columns}"
             )
         
-        # Select and collect data
-        result_df = df.select(required_columns).collect()
-        
-        # Format for frontend
-        chart_data = []
-        for row in result_df.to_dicts():
-            point = {
-                "x": row[config.x_column],
-                "y": row[config.y_column],
-            }
-            
-            if config.category_column:
-                point["category"] = row[config.category_column]
-            if config.size_column:
-                point["size"] = row[config.size_column]
-            if config.color_column:
-                point["color"] = row[config.color_column]
-                
-            chart_data.append(point)
+        # Rename the source columns to chart fields in Polars so the rows are
+        # serialised straight from Arrow without building Python dicts
+        chart_df = await run_in_threadpool(
+            current_data.lazy().select([pl.col(column).alias(field) for field, column in mapping]).collect,
+            engine="streaming",
+        )
         
-        return {
-            "data": chart_data,
-            "config": config.dict(),
-            "total_points": len(chart_data)
-        }
+        payload = await run_in_threadpool(_chart_json, chart_df, columnar)
+        content = b'{"data":%s,"config":%s,"total_points":%d}' % (
+            payload, config.model_dump_json().encode(), chart_df.height
+        )
+        return Response(content, media_type="application/json")
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -225,28 +461,9 @@ async def get_chart_data(config: ChartConfig):
 async def get_available_columns():
     """Get available columns for chart configuration"""
     try:
-        # Collect the schema from the LazyFrame
-        df_sample = current_data.limit(1).collect()  # Get a small sample to infer schema
-        schema = df_sample.schema
-        columns_info = []
-        
-        for name, dtype in schema.items():
-            columns_info.append({
-                "name": name,
-                "type": str(dtype),
-                "is_numeric": dtype in [pl.Float64, pl.Float32, pl.Int64, pl.Int32, pl.Int16, pl.Int8]
-            })
-        
-        # Get first and second columns for defaults
-        column_names = list(schema.keys())
-        first_column = column_names[0] if column_names else "x"
-        second_column = column_names[1] if len(column_names) > 1 else column_names[0] if column_names else "y"
-        
-        return {
-            "columns": columns_info,
-            "first_column": first_column,
-            "second_column": second_column
-        }
+        if _cache["columns"] is None:
+            build_column_metadata()
+        return _cache["columns"]
     except Exception as e:
         print(f"Error getting columns: {e}")
         return {
@@ -256,22 +473,27 @@ async def get_available_columns():
         }
 
 @app.post("/data/upload")
-async def upload_data(data: List[Dict[str, Any]]):
-    """Upload new data (replace existing data)"""
+async def upload_data(request: Request):
+    """Upload new data (replace existing data) from a JSON array of row objects"""
     global current_data
     try:
-        # Convert to Polars LazyFrame
-        current_data = pl.LazyFrame(data)
-        
-        # Validate data
-        row_count = len(data)
-        col_count = len(data[0]) if data else 0
+        # Parse the raw body in Polars rather than validating every row through Pydantic
+        body = await request.body()
+        if not body.lstrip().startswith(b"["):
+            raise HTTPException(status_code=400, detail="Data must be a JSON array of row objects")
+        df = await run_in_threadpool(pl.read_json, io.BytesIO(body))
+        if df.is_empty():
+            raise HTTPException(status_code=400, detail="Uploaded data contains no rows")
+        current_data = df
+        await publish_current_data()
         
         return {
             "message": "Data uploaded successfully",
-            "rows": row_count,
-            "columns": col_count
+            "rows": df.height,
+            "columns": df.width
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error processing data: {str(e)}")
 
@@ -289,30 +511,16 @@ async def upload_csv_file(file: UploadFile = File(...)):
         if not file.filename.lower().endswith('.csv'):
             raise HTTPException(status_code=400, detail="File must be a CSV file")
         
-        # Read file content
-        content = await file.read()
-        print(f"File content length: {len(content)} bytes")
-        
-        if len(content) == 0:
+        if not file.size:
             raise HTTPException(status_code=400, detail="File is empty")
         
-        # Convert bytes to string
-        try:
-            csv_string = content.decode('utf-8')
-        except UnicodeDecodeError:
-            try:
-                csv_string = content.decode('latin-1')
-            except UnicodeDecodeError as e:
-                raise HTTPException(status_code=400, detail=f"Could not decode file. Please ensure it's a valid UTF-8 or Latin-1 encoded CSV file: {str(e)}")
-        
-        print(f"Decoded CSV string preview: {csv_string[:200]}...")
-        
-        # Create StringIO object for polars
-        csv_io = io.StringIO(csv_string)
+        preview = file.file.read(200)
+        file.file.seek(0)
+        print(f"CSV preview: {preview.decode('utf-8', errors='replace')}...")
         
-        # Read CSV with Polars
+        # Parsing runs in a worker thread so large uploads don't block other requests
         try:
-            df = pl.read_csv(csv_io)
+            df = await run_in_threadpool(_read_csv_upload, file.file)
         except Exception as e:
             print(f"Polars CSV read error: {str(e)}")
             raise HTTPException(status_code=400, detail=f"Error parsing CSV file: {str(e)}")
@@ -320,21 +528,22 @@ async def upload_csv_file(file: UploadFile = File(...)):
         if df.is_empty():
             raise HTTPException(status_code=400, detail="CSV file contains no data")
         
-        current_data = df.lazy()
+        current_data = df
+        await publish_current_data()
         
         # Get basic info
-        schema = current_data.collect_schema()
-        row_count = len(df)
+        schema = current_data.schema
+        row_count = df.height
         col_count = len(schema)
         
         print(f"Successfully loaded CSV: {row_count} rows, {col_count} columns")
         
-        return {
+        return ORJSONResponse(content={
             "message": f"CSV file '{file.filename}' uploaded successfully",
             "rows": row_count,
             "columns": col_count,
             "column_names": list(schema.keys())
-        }
+        })
         
     except HTTPException:
         raise
@@ -344,30 +553,33 @@ async def upload_csv_file(file: UploadFile = File(...)):
         traceback.print_exc()
         raise HTTPException(status_code=400, detail=f"Error processing CSV file: {str(e)}")
 
-@app.get("/data/sample-datasets")
+# Manifest of the built-in datasets
+SAMPLE_DATASETS = [
+    {
+        "name": "business_metrics",
+        "description": "Comprehensive business performance data with financial, operational, and market metrics",
+        "size": 500,
+        "columns": ["revenue", "profit", "employees", "customers", "satisfaction", "market_share", "growth_rate"]
+    },
+    {
+        "name": "sales_data", 
+        "description": "Sales performance data by region, product, and time period",
+        "size": 300,
+        "columns": ["sales_amount", "units_sold", "region", "product", "quarter", "year"]
+    },
+    {
+        "name": "employee_metrics",
+        "description": "HR metrics including satisfaction, productivity, and retention data",
+        "size": 200,
+        "columns": ["employee_id", "department", "satisfaction", "productivity", "salary", "tenure"]
+    }
+]
+SAMPLE_DATASETS_BYTES = orjson.dumps({"datasets": SAMPLE_DATASETS})
+
+@app.get("/data/sample-datasets", response_model=None)
 async def get_sample_datasets():
     """Get list of available sample datasets"""
-    datasets = [
-        {
-            "name": "business_metrics",
-            "description": "Comprehensive business performance data with financial, operational, and market metrics",
-            "size": 500,
-            "columns": ["revenue", "profit", "employees", "customers", "satisfaction", "market_share", "growth_rate"]
-        },
-        {
-            "name": "sales_data", 
-            "description": "Sales performance data by region, product, and time period",
-            "size": 300,
-            "columns": ["sales_amount", "units_sold", "region", "product", "quarter", "year"]
-        },
-        {
-            "name": "employee_metrics",
-            "description": "HR metrics including satisfaction, productivity, and retention data",
-            "size": 200,
-            "columns": ["employee_id", "department", "satisfaction", "productivity", "salary", "tenure"]
-        }
-    ]
-    return {"datasets": datasets}
+    return Response(SAMPLE_DATASETS_BYTES, media_type="application/json", headers=STATIC_CACHE_HEADERS)
 
 @app.post("/data/load-sample/{dataset_name}")
 async def load_sample_dataset(dataset_name: str):
@@ -383,102 +595,106 @@ async def load_sample_dataset(dataset_name: str):
             current_data = generate_employee_data(200)
         else:
             raise HTTPException(status_code=404, detail="Dataset not found")
+        await publish_current_data()
             
         # Get info about loaded dataset
-        sample_data = current_data.limit(1).collect()
+        sample_data = current_data.head(1)
         schema = sample_data.schema
         
         return {
             "message": f"Sample dataset '{dataset_name}' loaded successfully",
-            "rows": 500 if dataset_name == "business_metrics" else 300 if dataset_name == "sales_data" else 200,
+            "rows": current_data.height,
             "columns": len(schema),
             "column_names": list(schema.keys()),
-            "sample_row": sample_data.to_dicts()[0] if len(sample_data) > 0 else {}
+            "sample_row": sample_data.row(0, named=True) if sample_data.height > 0 else {}
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading dataset: {str(e)}")
 
-def generate_sales_data(num_points: int = 300) -> pl.LazyFrame:
+def generate_sales_data(num_points: int = 300) -> pl.DataFrame:
     """Generate sales performance data"""
-    data = []
-    regions = ["North", "South", "East", "West", "Central"]
-    products = ["Product A", "Product B", "Product C", "Product D", "Product E"]
+    n = num_points
     
-    for i in range(num_points):
-        base_sales = random.uniform(10000, 100000)
-        units = random.randint(100, 1000)
-        
-        data.append({
-            "id": i,
-            "sales_amount": round(base_sales, 2),
-            "units_sold": units,
-            "price_per_unit": round(base_sales / units, 2),
-            "region": random.choice(regions),
-            "product": random.choice(products),
-            "quarter": random.choice([1, 2, 3, 4]),
-            "year": random.choice([2023, 2024, 2025]),
-            "salesperson": f"Rep_{random.randint(1, 50)}",
-            "commission": round(base_sales * random.uniform(0.05, 0.15), 2),
-            "customer_type": random.choice(["Enterprise", "SMB", "Individual"]),
-            "sales_channel": random.choice(["Direct", "Partner", "Online"]),
-            "discount_rate": round(random.uniform(0, 0.20), 3),
-            "profit_margin": round(random.uniform(0.10, 0.40), 3)
-        })
+    base_sales = _RNG.uniform(10000, 100000, n)
+    units = _RNG.integers(100, 1001, n)
+    
+    data = {
+        "id": np.arange(n),
+        "sales_amount": base_sales,
+        "units_sold": units,
+        "price_per_unit": (base_sales / units),
+        "region": _pick(SALES_REGIONS, n),
+        "product": _pick(SALES_PRODUCTS, n),
+        "quarter": _RNG.integers(1, 5, n),
+        "year": _pick(YEARS, n),
+        "salesperson": np.char.add("Rep_", _RNG.integers(1, 51, n).astype(str)),
+        "commission": base_sales * _RNG.uniform(0.05, 0.15, n),
+        "customer_type": _pick(CUSTOMER_TYPES, n),
+        "sales_channel": _pick(SALES_CHANNELS, n),
+        "discount_rate": _RNG.uniform(0, 0.20, n),
+        "profit_margin": _RNG.uniform(0.10, 0.40, n)
+    }
     
-    return pl.LazyFrame(data)
+    return pl.DataFrame(data)
 
-def generate_employee_data(num_points: int = 200) -> pl.LazyFrame:
+def generate_employee_data(num_points: int = 200) -> pl.DataFrame:
     """Generate employee HR metrics data"""
-    data = []
-    departments = ["Engineering", "Sales", "Marketing", "HR", "Finance", "Operations"]
-    positions = ["Junior", "Mid-level", "Senior", "Lead", "Manager", "Director"]
+    n = num_points
     
-    for i in range(num_points):
-        tenure_years = random.uniform(0.5, 15)
-        base_salary = random.uniform(40000, 200000)
-        
-        data.append({
-            "employee_id": f"EMP_{i:04d}",
-            "department": random.choice(departments),
-            "position": random.choice(positions),
-            "satisfaction_score": round(random.uniform(1, 10), 1),
-            "productivity_score": round(random.uniform(60, 100), 1),
-            "salary": round(base_salary, 2),
-            "tenure_years": round(tenure_years, 1),
-            "age": random.randint(22, 65),
-            "training_hours": random.randint(0, 100),
-            "performance_rating": round(random.uniform(2.0, 5.0), 1),
-            "bonus_percentage": round(random.uniform(0, 0.25), 3),
-            "remote_work_days": random.randint(0, 5),
-            "overtime_hours": random.randint(0, 20),
-            "certifications": random.randint(0, 8),
-            "promotion_eligible": random.choice([True, False])
-        })
+    tenure_years = _RNG.uniform(0.5, 15, n)
+    base_salary = _RNG.uniform(40000, 200000, n)
+    
+    data = {
+        "employee_id": np.char.add("EMP_", np.char.zfill(np.arange(n).astype(str), 4)),
+        "department": _pick(EMPLOYEE_DEPARTMENTS, n),
+        "position": _pick(POSITIONS, n),
+        "satisfaction_score": _RNG.uniform(1, 10, n),
+        "productivity_score": _RNG.uniform(60, 100, n),
+        "salary": base_salary,
+        "tenure_years": tenure_years,
+        "age": _RNG.integers(22, 66, n),
+        "training_hours": _RNG.integers(0, 101, n),
+        "performance_rating": _RNG.uniform(2.0, 5.0, n),
+        "bonus_percentage": _RNG.uniform(0, 0.25, n),
+        "remote_work_days": _RNG.integers(0, 6, n),
+        "overtime_hours": _RNG.integers(0, 21, n),
+        "certifications": _RNG.integers(0, 9, n),
+        "promotion_eligible": _RNG.integers(0, 2, n, dtype=bool)
+    }
     
-    return pl.LazyFrame(data)
+    return pl.DataFrame(data)
 
-@app.post("/data/filter")
+@app.post("/data/filter", response_model=None)
 async def filter_data(filters: Dict[str, Any]):
     """Apply filters to the data"""
+    unknown_columns = [column for column in filters if column not in get_schema()]
+    if unknown_columns:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {unknown_columns}")
+    
     try:
-        df = current_data
-        
-        # Apply filters (basic implementation)
+        # Build every condition first so the data is filtered in a single pass
+        predicates = []
         for column, filter_value in filters.items():
             if isinstance(filter_value, dict):
-                if "min" in filter_value:
-                    df = df.filter(pl.col(column) >= filter_value["min"])
-                if "max" in filter_value:
-                    df = df.filter(pl.col(column) <= filter_value["max"])
+                if "min" in filter_value and "max" in filter_value:
+                    predicates.append(pl.col(column).is_between(filter_value["min"], filter_value["max"]))
+                elif "min" in filter_value:
+                    predicates.append(pl.col(column) >= filter_value["min"])
+                elif "max" in filter_value:
+                    predicates.append(pl.col(column) <= filter_value["max"])
+            elif isinstance(filter_value, list):
+                predicates.append(pl.col(column).is_in(filter_value))
             else:
-                df = df.filter(pl.col(column) == filter_value)
+                predicates.append(pl.col(column) == filter_value)
         
-        result = df.collect()
-        return {
-            "data": result.to_dicts(),
-            "total_rows": len(result)
-        }
+        query = current_data.lazy()
+        if predicates:
+            query = query.filter(pl.all_horizontal(predicates))
+        df = await run_in_threadpool(query.collect, engine="streaming")
+        
+        # Send the rows slice by slice so the client starts receiving them straight away
+        return StreamingResponse(_iter_rows_json(df), media_type="application/json")
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error applying filters: {str(e)}")
@@ -514,6 +730,12 @@ class BrowserAnimationRequest(BaseModel):
     animationConfig: Dict[str, Any] = {}
 
 
+def _read_log_tail(f, max_bytes: int = 8192) -> str:
+    """Return the last max_bytes of an open binary log file as text"""
+    f.seek(0, os.SEEK_END)
+    f.seek(max(f.tell() - max_bytes, 0))
+    return f.read().decode(errors='replace')
+
 @app.post("/api/record-animation")
 async def record_animation(params: RecordingParams):
     """Execute Python script to record chart animation"""
@@ -547,20 +769,21 @@ async def record_animation(params: RecordingParams):
         if params.y_columns:
             cmd.extend(["--y-columns"] + params.y_columns)
         
-        # Execute the recording script
+        # Execute the recording script, sending its output straight to temporary
+        # log files (deleted once read) so long recordings don't buffer everything in memory
         print(f"Executing command: {' '.join(cmd)}")  # Debug log
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=str(scripts_dir)
-        )
-        
-        stdout, stderr = await process.communicate()
-        
-        # Log the output for debugging
-        stdout_text = stdout.decode()
-        stderr_text = stderr.decode()
+        with tempfile.TemporaryFile() as stdout_file, tempfile.TemporaryFile() as stderr_file:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=stdout_file,
+                stderr=stderr_file,
+                cwd=str(scripts_dir)
+            )
+            await process.wait()
+            
+            # Only the end of each log is returned for debugging
+            stdout_text = _read_log_tail(stdout_file)
+            stderr_text = _read_log_tail(stderr_file)
         print(f"Process return code: {process.returncode}")
         print(f"STDOUT: {stdout_text}")
         print(f"STDERR: {stderr_text}")
@@ -621,7 +844,7 @@ async def record_browser_animation(request: BrowserAnimationRequest):
         from browser_capture import generate_browser_capture_script
         
         # Create session ID
-        session_id = f"recording-{datetime.now().strftime('%Y%m%d_%H%M%S')}-{os.urandom(4).hex()}"
+        session_id = f"recording-{secrets.token_hex(12)}"
         
         # Generate filename if not provided
         if not request.filename:
@@ -655,7 +878,7 @@ async def record_browser_animation(request: BrowserAnimationRequest):
             'progress': 0,
             'message': 'Ready to capture frames in current browser',
             'filename': request.filename,
-            'started_at': datetime.now(),
+            'started_at': time.time_ns(),  # Formatted only when reported
             'completed': False,
             'error': None,
             'capture_script': capture_script
@@ -677,6 +900,37 @@ async def record_browser_animation(request: BrowserAnimationRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start browser capture: {str(e)}")
 
+def _build_gif(frames_data: List[str], frame_delay: int, output_path: str) -> int:
+    """Decode base64 frame images and save them as a looping GIF; returns the frame count"""
+    def decode(frame: str) -> Image.Image:
+        # Strip any data URL prefix before decoding
+        return Image.open(io.BytesIO(base64.b64decode(frame.split(',', 1)[-1]))).convert("RGB")
+    
+    # Build one palette from the first, middle and last frames and map every frame onto it,
+    # which avoids a per-frame palette search and a whole-sequence optimize pass
+    first = decode(frames_data[0])
+    samples = [first] + [decode(frames_data[i]) for i in sorted({len(frames_data) // 2, len(frames_data) - 1} - {0})]
+    sheet = Image.new("RGB", (first.width, first.height * len(samples)))
+    for i, sample in enumerate(samples):
+        sheet.paste(sample, (0, first.height * i))
+    palette = sheet.quantize(method=Image.Quantize.FASTOCTREE)
+    
+    def remaining_frames():
+        # Decoded lazily so only one full-colour frame is held at a time
+        for frame in frames_data[1:]:
+            yield decode(frame).quantize(palette=palette)
+    
+    first.quantize(palette=palette).save(
+        output_path,
+        save_all=True,
+        append_images=remaining_frames(),
+        duration=frame_delay,
+        loop=0,
+        optimize=False,
+        disposal=2
+    )
+    return len(frames_data)
+
 @app.post("/api/create-gif-from-frames")
 async def create_gif_from_frames(request: dict):
     """Create a GIF from base64 encoded frame images"""
@@ -695,38 +949,18 @@ async def create_gif_from_frames(request: dict):
         output_dir.mkdir(exist_ok=True)
         output_path = output_dir / filename
         
-        # Convert base64 frames to PIL images
-        images = []
-        for frame_data in frames_data:
-            # Remove data URL prefix if present
-            if frame_data.startswith('data:image/png;base64,'):
-                frame_data = frame_data.split(',')[1]
-            
-            # Decode base64 to image
-            image_bytes = base64.b64decode(frame_data)
-            image = Image.open(io.BytesIO(image_bytes))
-            images.append(image)
-        
-        # Create GIF
-        if images:
-            duration = config.get('frameDelay', 1000)
-            images[0].save(
-                str(output_path),
-                save_all=True,
-                append_images=images[1:],
-                duration=duration,
-                loop=0,
-                optimize=True
-            )
-            
-            return {
-                "success": True,
-                "filename": filename,
-                "message": "GIF created successfully",
-                "frameCount": len(images)
-            }
-        else:
-            raise HTTPException(status_code=400, detail="No valid frames to process")
+        # Decoding and GIF encoding are CPU-bound, so keep them off the event loop
+        duration = config.get('frameDelay', 1000)
+        frame_count = await asyncio.get_running_loop().run_in_executor(
+            None, _build_gif, frames_data, duration, str(output_path)
+        )
+        
+        return {
+            "success": True,
+            "filename": filename,
+            "message": "GIF created successfully",
+            "frameCount": frame_count
+        }
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create GIF: {str(e)}")
@@ -734,16 +968,10 @@ async def create_gif_from_frames(request: dict):
 @app.get("/api/recording-status/{session_id}")
 async def get_recording_status(session_id: str):
     """Get the status of a browser automation recording session"""
-    if session_id not in recording_sessions:
+    session = recording_sessions.get(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail=f"Recording session {session_id} not found")
     
-    session = recording_sessions[session_id]
-    
-    # Clean up completed sessions after a while
-    if session['completed'] and (datetime.now() - session['started_at']).seconds > 300:  # 5 minutes
-        # Keep the essential info but mark for cleanup
-        session['can_cleanup'] = True
-    
     return {
         "sessionId": session_id,
         "status": session['status'],
@@ -752,7 +980,7 @@ async def get_recording_status(session_id: str):
         "completed": session['completed'],
         "error": session.get('error'),
         "filename": session.get('filename'),
-        "started_at": session['started_at'].isoformat()
+        "started_at": datetime.fromtimestamp(session['started_at'] / 1e9).isoformat()
     }
 
 @app.get("/api/download-file/{filename}")
@@ -774,4 +1002,19 @@ async def download_file(filename: str):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    if os.environ.get("DEV"):
+        # Auto-reload only works with a single worker
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    else:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8000,
+            loop="uvloop",
+            http="httptools",
+            # One worker by default: browser recording sessions and browser pools live
+            # in a single process. Set WORKERS to scale the data endpoints across cores
+            workers=int(os.environ.get("WORKERS", 1)),
+            limit_concurrency=1000,
+            timeout_keep_alive=30,
+        )
@@ -5,34 +5,256 @@ Creates smooth interpolated animations by calculating intermediate positions bet
 """
 
 import argparse
+import atexit
+import base64
+import io
+import os
+import shutil
+import subprocess
 import time
 import json
 import sys
+import tempfile
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from multiprocessing import Manager, resource_tracker, shared_memory
 from pathlib import Path
 from urllib.parse import urljoin
-import cv2
+from urllib.request import urlopen
 import numpy as np
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from PIL import Image, ImageDraw, ImageFont
-import imageio
-import math
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('recording.log')
-    ]
-)
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+# OpenCV and Pillow are slow to load, so they are imported where first
+# needed rather than here; --help and argument errors return straight away
+
+# Setup logging. Records are handed to a queue and written to stdout and the log
+# file by a background thread, so logging never blocks the capture loop on I/O
+_log_listener = None
+_log_pid = None
+
+def setup_logging():
+    """Start queue-based logging for this process (worker processes call it again)"""
+    global _log_listener, _log_pid
+    if _log_pid == os.getpid():
+        return
+    
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = [logging.StreamHandler(sys.stdout), logging.FileHandler('recording.log')]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, *handlers)
+    _log_listener.start()
+    _log_pid = os.getpid()
+    # The queue handler only merges the message; the listener's handlers add the rest
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler], force=True)
+
+def stop_logging():
+    """Write out any queued records and stop the logging thread"""
+    global _log_pid
+    if _log_listener is not None and _log_pid == os.getpid():
+        _log_listener.stop()
+        _log_pid = None
+
+setup_logging()
+atexit.register(stop_logging)
 logger = logging.getLogger(__name__)
 
+# Quality of the JPEG screenshots taken through the DevTools protocol
+JPEG_QUALITY = 90
+
+# Optional gifsicle binary used to shrink saved GIFs
+GIFSICLE_PATH = shutil.which("gifsicle")
+
+# Optional ffmpeg binary; MP4s are encoded as H.264 through it, or with OpenCV's mp4v without it
+FFMPEG_PATH = shutil.which("ffmpeg")
+
+# Page-relative rectangle of the chart, used as the DevTools screenshot clip
+CHART_RECT_SCRIPT = """
+const chart = document.querySelector('.recharts-wrapper') || document.querySelector('.chart-container');
+if (!chart) return null;
+const r = chart.getBoundingClientRect();
+return [r.x + window.scrollX, r.y + window.scrollY, r.width, r.height];
+"""
+
+# Readiness signals published by the frontend (src/utils/chartReady.ts): App sets
+# __dataReady once the dataset's columns are loaded, and the scatter chart marks
+# __chartReady done when its render transition ends
+CHART_READY_SCRIPT = """
+return window.__dataReady === true && (!window.__chartReady || window.__chartReady.done === true);
+"""
+CHART_READY_TIMEOUT = 15
+
+# Captured frames waiting for the MP4 encoder thread; capture blocks when it is full
+ENCODE_QUEUE_SIZE = 8
+
+# Seconds a RecorderPool worker waits for the others' browsers before giving up
+WORKER_START_TIMEOUT = 60
+
+# Largest share of available memory a recording may keep resident as frames
+MEMORY_BUDGET_FRACTION = 0.5
+
+# Long-lived Chrome shared by --reuse-browser recordings, one tab per recording
+DEBUGGER_ADDRESS = "127.0.0.1:9222"
+DEBUG_PROFILE_DIR = os.path.join(tempfile.gettempdir(), "recorder")
+CHROME_BINARIES = [
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+# ffmpeg H.264 encoders in order of preference; LGPL builds (e.g. conda's) lack libx264
+H264_ENCODERS = ["libx264", "libopenh264"]
+
+
+@lru_cache(maxsize=None)
+def h264_encoder():
+    """
+    Pick an H.264 encoder this ffmpeg build provides, using the VideoToolbox hardware
+    encoder on macOS when present; None when there is none (or no ffmpeg)
+    """
+    if not FFMPEG_PATH:
+        return None
+    try:
+        listing = subprocess.run(
+            [FFMPEG_PATH, "-hide_banner", "-encoders"], capture_output=True, text=True, check=True
+        ).stdout
+    except (subprocess.CalledProcessError, OSError) as e:
+        logger.warning(f"Could not list ffmpeg encoders: {e}")
+        return None
+    
+    # Encoder lines look like " V....D libx264   libx264 H.264 / AVC ..."
+    encoders = {line.split()[1] for line in listing.splitlines() if len(line.split()) > 1}
+    candidates = (["h264_videotoolbox"] if sys.platform == "darwin" else []) + H264_ENCODERS
+    encoder = next((name for name in candidates if name in encoders), None)
+    if encoder is None:
+        logger.warning("ffmpeg has no H.264 encoder; falling back to OpenCV")
+    return encoder
+
+
+class FfmpegWriter:
+    """Pipe raw BGR frames to ffmpeg for H.264 encoding; same write/release interface as cv2.VideoWriter"""
+    
+    def __init__(self, output_path, fps, size, encoder):
+        width, height = size
+        command = [
+            FFMPEG_PATH, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+            # yuv420p needs even dimensions, and chart clips often aren't
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            "-c:v", encoder,
+        ]
+        if encoder == "libx264":
+            command += ["-preset", "veryfast"]
+        command += ["-pix_fmt", "yuv420p", output_path]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+    
+    def write(self, frame):
+        try:
+            self.process.stdin.write(np.ascontiguousarray(frame).data)
+        except BrokenPipeError:
+            raise RuntimeError(f"ffmpeg exited with code {self.process.wait()}") from None
+    
+    def release(self):
+        """Finish the video; raises RuntimeError if ffmpeg failed"""
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with code {self.process.returncode}")
+
+
+def create_video_writer(output_path, fps, width, height):
+    """Open an MP4 writer, preferring ffmpeg's H.264 over OpenCV's MPEG-4 Part 2 encoder"""
+    encoder = h264_encoder()
+    if encoder:
+        return FfmpegWriter(output_path, fps, (width, height), encoder)
+    import cv2
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    return cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+
+
+def available_memory():
+    """Bytes of memory available without swapping, or None when it can't be determined"""
+    try:
+        import psutil  # Optional
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def debug_browser_running(debug_addr):
+    """Check whether a Chrome DevTools endpoint is listening at debug_addr"""
+    try:
+        with urlopen(f"http://{debug_addr}/json/version", timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+def launch_debug_browser(debug_addr=DEBUGGER_ADDRESS, headless=False, timeout=15):
+    """
+    Start a Chrome that later recordings can attach to, unless one is already
+    listening at debug_addr. The browser outlives this process; returns True
+    once its DevTools endpoint answers.
+    """
+    if debug_browser_running(debug_addr):
+        return True
+    
+    chrome = next((path for path in map(shutil.which, CHROME_BINARIES) if path), None)
+    if chrome is None:
+        logger.error("Could not find a Chrome binary to launch")
+        return False
+    
+    host, port = debug_addr.rsplit(":", 1)
+    command = [
+        chrome,
+        f"--remote-debugging-address={host}",
+        f"--remote-debugging-port={port}",
+        f"--user-data-dir={DEBUG_PROFILE_DIR}",
+        "--window-size=1200,800",
+        "--disable-gpu",
+        "--disable-dev-shm-usage",
+        "--no-sandbox",
+        "--disable-extensions",
+        "--no-first-run",
+    ]
+    if headless:
+        command.append("--headless=new")
+    logger.info(f"Launching Chrome with remote debugging on {debug_addr}...")
+    subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if debug_browser_running(debug_addr):
+            return True
+        time.sleep(0.25)
+    logger.error(f"Chrome did not start listening on {debug_addr}")
+    return False
+
 
 class ChartAnimationRecorder:
     def __init__(self, base_url="http://localhost:5174", headless=False):
@@ -40,6 +262,16 @@ class ChartAnimationRecorder:
         self.headless = headless
         self.driver = None
         self.frames = []
+        self.n_written = 0  # Number of leading entries of self.frames holding captured frames
+        self._video_writer = None  # Open while MP4 frames are being encoded during capture
+        self._frame_q = None
+        self._encoder = None
+        self._encode_error = None  # Set by the encoder thread if the writer fails
+        self._clip = None  # Chart rectangle for DevTools screenshots, resolved once the chart has loaded
+        self._chart_element = None  # Resolved chart container, reused across frames
+        self._bgr_convert = None  # RGB(A) -> BGR converter for PNG frames, chosen from the first one
+        self.frames_dropped = False  # Frames were too big to keep, so only the MP4 was recorded
+        self._attached = False  # Driving a tab in a shared browser that must outlive this recorder
         
     def setup_driver(self):
         """Setup Chrome WebDriver with optimal settings for recording"""
@@ -67,35 +299,61 @@ class ChartAnimationRecorder:
             self.driver = webdriver.Chrome(options=chrome_options)
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             logger.info("Chrome driver initialized successfully")
+            return self.driver
         except Exception as e:
             logger.error(f"Failed to initialize Chrome driver: {e}")
             raise
+    
+    def attach(self, debug_addr=DEBUGGER_ADDRESS):
+        """Drive a new tab in an already running Chrome instead of starting a browser"""
+        logger.info(f"Attaching to Chrome at {debug_addr}...")
+        
+        chrome_options = Options()
+        chrome_options.add_experimental_option("debuggerAddress", debug_addr)
+        
+        try:
+            self.driver = webdriver.Chrome(options=chrome_options)
+            self._attached = True
+            self.driver.switch_to.new_window('tab')
+            logger.info("Attached to Chrome in a new tab")
+            return self.driver
+        except Exception as e:
+            logger.error(f"Failed to attach to Chrome: {e}")
+            raise
         
     def wait_for_chart_load(self):
         """Wait for chart to load completely"""
-        self.logger.info("Waiting for chart to load...")
+        logger.info("Waiting for chart to load...")
         
         # Wait for recharts-wrapper
-        self.logger.info("Looking for recharts-wrapper...")
+        logger.info("Looking for recharts-wrapper...")
         chart_element = WebDriverWait(self.driver, 10).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, ".recharts-wrapper"))
         )
-        self.logger.info("Found recharts-wrapper")
+        logger.info("Found recharts-wrapper")
+        self._chart_element = chart_element
         
-        # Check for export-animation controls (optional)
-        self.logger.info("Checking for export-animation controls...")
+        # Wait for the page to report its data loaded and the chart's transition
+        # finished, rather than sleeping for a fixed time
         try:
-            export_controls = WebDriverWait(self.driver, 2).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".export-animation"))
+            WebDriverWait(self.driver, CHART_READY_TIMEOUT, poll_frequency=0.05).until(
+                lambda driver: driver.execute_script(CHART_READY_SCRIPT)
             )
-            self.logger.info("Found export-animation controls")
-        except Exception as e:
-            self.logger.info("Export controls not found - continuing anyway")
-            self.logger.debug(f"Export controls error: {e}")
-        
-        # Additional wait for chart to be fully rendered
-        time.sleep(2)
-        self.logger.info("Chart should be fully loaded now")
+            logger.info("Chart reported ready")
+        except TimeoutException:
+            logger.warning("Chart did not report ready in time - continuing anyway")
+        self.cache_chart_clip()
+        return True
+    
+    def cache_chart_clip(self):
+        """Measure the chart once so DevTools screenshots can be clipped to it without a DOM lookup per frame"""
+        if not hasattr(self.driver, "execute_cdp_cmd"):
+            return
+        rect = self.driver.execute_script(CHART_RECT_SCRIPT)
+        if rect:
+            x, y, width, height = rect
+            self._clip = {"x": x, "y": y, "width": width, "height": height, "scale": 1}
+            logger.info(f"Chart clip: {self._clip}")
     
     def setup_animation(self, x_columns, y_columns, animation_speed=2):
         """Configure the chart for animation"""
@@ -128,91 +386,247 @@ class ChartAnimationRecorder:
             return False
     
     def get_chart_element(self):
-        """Get the chart container element"""
+        """Get the chart container element, looking it up only the first time"""
+        if self._chart_element is not None:
+            return self._chart_element
+        
         logger.info("Looking for chart element...")
         try:
-            element = self.driver.find_element(By.CLASS_NAME, "recharts-wrapper")
+            self._chart_element = self.driver.find_element(By.CLASS_NAME, "recharts-wrapper")
             logger.info("Found recharts-wrapper element")
-            return element
+            return self._chart_element
         except:
             try:
-                element = self.driver.find_element(By.CLASS_NAME, "chart-container")
+                self._chart_element = self.driver.find_element(By.CLASS_NAME, "chart-container")
                 logger.info("Found chart-container element")
-                return element
+                return self._chart_element
             except:
                 logger.error("Could not find chart element")
                 # List all elements for debugging
                 elements = self.driver.find_elements(By.TAG_NAME, "div")
-                logger.debug(f"Found {len(elements)} div elements on page")
-                for i, elem in enumerate(elements[:10]):  # Log first 10
-                    classes = elem.get_attribute("class") or "no-class"
-                    logger.debug(f"Div {i}: classes='{classes}'")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Found {len(elements)} div elements on page")
+                    for i, elem in enumerate(elements[:10]):  # Log first 10
+                        classes = elem.get_attribute("class") or "no-class"
+                        logger.debug(f"Div {i}: classes='{classes}'")
                 return None
     
-    def capture_chart_frame(self):
-        """Capture a single frame of the chart"""
+    def grab_screenshot(self, chart_element, out=None):
+        """
+        Screenshot the chart as a BGR pixel array, the layout the MP4 writers take, so
+        frames need no conversion when encoded. chart_element may be None once the clip
+        is cached; out is used as the destination where the decoder allows it.
+        """
+        if hasattr(self.driver, "execute_cdp_cmd"):
+            # Chrome can encode a JPEG of just the chart's rectangle, which is much
+            # cheaper than the PNG WebDriver produces and decodes faster too
+            clip = self._clip
+            if clip is None:
+                rect = chart_element.rect
+                clip = {"x": rect["x"], "y": rect["y"], "width": rect["width"], "height": rect["height"], "scale": 1}
+            result = self.driver.execute_cdp_cmd("Page.captureScreenshot", {
+                "format": "jpeg",
+                "quality": JPEG_QUALITY,
+                "clip": clip,
+                "captureBeyondViewport": False,
+            })
+            import cv2
+            encoded = np.frombuffer(base64.b64decode(result["data"]), dtype=np.uint8)
+            return cv2.imdecode(encoded, cv2.IMREAD_COLOR)  # Already BGR
+        
+        # Other browsers: element PNG screenshot, swapped to BGR straight into out
+        from PIL import Image
+        with Image.open(io.BytesIO(chart_element.screenshot_as_png)) as image:
+            pixels = np.asarray(image)
+        if out is not None and out.shape != pixels.shape[:2] + (3,):
+            out = None
+        if self._bgr_convert is None:
+            self._bgr_convert = self._rgba_to_bgr if pixels.shape[2] == 4 else self._rgb_to_bgr
+        return self._bgr_convert(pixels, out)
+    
+    def capture_chart_frame(self, out=None):
+        """Capture a single frame of the chart, writing it into out when a buffer is given"""
         try:
-            chart_element = self.get_chart_element()
-            if not chart_element:
-                return None
+            chart_element = None
+            if self._clip is None:
+                chart_element = self.get_chart_element()
+                if not chart_element:
+                    return None
             
-            # Get element screenshot
-            screenshot = chart_element.screenshot_as_png
+            pixels = self.grab_screenshot(chart_element, out)
             
-            # Convert to PIL Image
-            image = Image.open(io.BytesIO(screenshot))
-            return np.array(image)
+            if out is None or pixels is out:
+                return pixels
+            if pixels.shape != out.shape:
+                logger.warning(f"Frame shape {pixels.shape} does not match buffer {out.shape}")
+                return None
+            np.copyto(out, pixels)
+            return out
             
+        except StaleElementReferenceException:
+            # The chart was re-rendered; look it up again on the next frame
+            self._chart_element = None
+            logger.warning("Chart element went stale")
+            return None
         except Exception as e:
             print(f"Error capturing frame: {e}")
             return None
     
-    def record_animation(self, duration_seconds=10, fps=30):
-        """Record the chart animation for specified duration"""
+    def record_animation(self, duration_seconds=10, fps=30, video_path=None, keep_frames=True):
+        """
+        Record the chart animation for specified duration.
+        With video_path set, frames are encoded to that MP4 as they are captured; with
+        keep_frames=False they are not kept afterwards, so memory stays at the few
+        frames queued for the encoder.
+        """
         logger.info(f"Recording animation for {duration_seconds} seconds at {fps} FPS...")
         
-        frame_interval = 1.0 / fps
         total_frames = int(duration_seconds * fps)
         
-        self.frames = []
+        # Kept frames go into one contiguous (frames, height, width, channels) buffer,
+        # allocated once the first capture gives the frame size. Otherwise each decoded
+        # screenshot goes straight to the encoder and is dropped once written
+        self.frames = None
+        self.n_written = 0
+        self.frames_dropped = False
+        captured = 0
+        
+        # Frames are paced against absolute deadlines on a monotonic clock, so slow
+        # captures don't push every later frame back
+        interval_ns = int(1e9 / fps)
+        start_ns = time.monotonic_ns()
+        progress_every = max(1, fps // 2)  # Terminal progress about twice a second
         
         for frame_num in range(total_frames):
-            start_time = time.time()
-            
             # Capture frame
-            frame = self.capture_chart_frame()
+            out = self.frames[captured] if keep_frames and self.frames is not None else None
+            frame = self.capture_chart_frame(out=out)
             if frame is not None:
-                self.frames.append(frame)
+                if captured == 0:
+                    if keep_frames and not self._frames_fit(total_frames, frame):
+                        if not video_path:
+                            print("Recording is too large to keep in memory as a GIF; use --format mp4 or a shorter duration")
+                            return False
+                        # Too big to keep: stream to the MP4 only and skip the GIF
+                        logger.warning("Not enough memory to keep frames; recording the MP4 only")
+                        print("Not enough memory to keep frames for a GIF; recording the MP4 only")
+                        keep_frames = False
+                        self.frames_dropped = True
+                    if keep_frames:
+                        self.frames = np.empty((total_frames,) + frame.shape, dtype=np.uint8)
+                        self.frames[0] = frame
+                    if video_path:
+                        self._open_video_writer(video_path, fps, frame.shape)
+                if self._video_writer is not None:
+                    self._frame_q.put(frame)
+                    if self._encode_error is not None:
+                        break
+                captured += 1
                 if frame_num % 30 == 0:  # Log every 30 frames
                     logger.info(f"Captured frame {frame_num + 1}/{total_frames}")
-                print(f"Captured frame {frame_num + 1}/{total_frames}", end='\r')
+                if frame_num % progress_every == 0:
+                    print(f"Captured frame {frame_num + 1}/{total_frames}", end='\r')
             else:
                 logger.warning(f"Failed to capture frame {frame_num + 1}")
             
             # Maintain frame rate
-            elapsed = time.time() - start_time
-            sleep_time = max(0, frame_interval - elapsed)
-            time.sleep(sleep_time)
+            deadline = start_ns + (frame_num + 1) * interval_ns
+            sleep_s = (deadline - time.monotonic_ns()) / 1e9
+            if sleep_s > 0:
+                time.sleep(sleep_s)
+            elif logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Frame {frame_num + 1} finished {-sleep_s * 1000:.1f} ms after its deadline")
         
-        logger.info(f"\nCaptured {len(self.frames)} frames total")
-        print(f"\nCaptured {len(self.frames)} frames")
-        return len(self.frames) > 0
+        self._stop_encoder()
+        if self._encode_error is not None:
+            logger.error(f"Video encoding failed: {self._encode_error}")
+            print(f"Video encoding failed: {self._encode_error}")
+            return False
+        self.n_written = captured if keep_frames else 0
+        logger.info(f"\nCaptured {captured} frames total")
+        print(f"\nCaptured {captured} frames")
+        return captured > 0
+    
+    @staticmethod
+    def _frames_fit(total_frames, frame):
+        """Check that keeping every frame, plus the palette images a GIF save adds, fits the memory budget"""
+        bytes_est = total_frames * frame.nbytes * 4 // 3
+        available = available_memory()
+        logger.info(
+            f"Keeping {total_frames} frames needs about {bytes_est / 2**20:.0f} MB"
+            + (f" of {available / 2**20:.0f} MB available" if available is not None else "")
+        )
+        return available is None or bytes_est <= available * MEMORY_BUDGET_FRACTION
+    
+    def _open_video_writer(self, output_path, fps, frame_shape):
+        height, width = frame_shape[:2]
+        self._video_writer = create_video_writer(output_path, fps, width, height)
+        
+        # Encode on a background thread so the next screenshot overlaps with it
+        self._encode_error = None
+        self._frame_q = queue.Queue(maxsize=ENCODE_QUEUE_SIZE)
+        self._encoder = threading.Thread(target=self._encode_loop, daemon=True)
+        self._encoder.start()
+    
+    def _encode_loop(self):
+        while True:
+            frame = self._frame_q.get()
+            if frame is None:
+                break
+            if self._encode_error is None:
+                try:
+                    self._video_writer.write(frame)
+                except Exception as e:
+                    # Keep draining the queue so capture never blocks on a dead writer
+                    self._encode_error = e
+    
+    def _stop_encoder(self):
+        """Wait for the encoder thread to write every queued frame"""
+        if self._encoder is not None:
+            self._frame_q.put(None)
+            self._encoder.join()
+            self._encoder = None
+    
+    @staticmethod
+    def _rgba_to_bgr(pixels, out=None):
+        """Drop alpha and reverse the channels in one strided copy"""
+        if out is None:
+            out = np.empty(pixels.shape[:2] + (3,), dtype=np.uint8)
+        np.copyto(out, pixels[..., 2::-1])
+        return out
+    
+    @staticmethod
+    def _rgb_to_bgr(pixels, out=None):
+        import cv2
+        return cv2.cvtColor(pixels, cv2.COLOR_RGB2BGR, dst=out)
     
     def save_as_gif(self, output_path, duration=None):
         """Save recorded frames as GIF"""
-        if not self.frames:
+        if self.n_written == 0:
             print("No frames to save")
             return False
         
+        import cv2
+        from PIL import Image
+        
         try:
-            # Convert numpy arrays to PIL Images
-            pil_frames = []
-            for frame in self.frames:
-                if frame.shape[2] == 4:  # RGBA
-                    pil_frame = Image.fromarray(frame, 'RGBA')
-                else:  # RGB
-                    pil_frame = Image.fromarray(frame, 'RGB')
-                pil_frames.append(pil_frame)
+            # One 256-colour palette for the whole animation, taken from the first,
+            # middle and last frames: frames stay colour-consistent, and the GIF
+            # gets a single global colour table instead of one per frame
+            samples = sorted({0, self.n_written // 2, self.n_written - 1})
+            montage = np.concatenate([self.frames[i] for i in samples])
+            palette = Image.fromarray(cv2.cvtColor(montage, cv2.COLOR_BGR2RGB)).quantize(
+                colors=256, method=Image.Quantize.MEDIANCUT
+            )
+            
+            # Map frames onto the palette in parallel; only the LZW write below
+            # has to run in order
+            def quantize(i):
+                rgb = cv2.cvtColor(self.frames[i], cv2.COLOR_BGR2RGB)
+                return Image.fromarray(rgb).quantize(palette=palette, dither=Image.Dither.FLOYDSTEINBERG)
+            
+            with ThreadPoolExecutor() as executor:
+                pil_frames = list(executor.map(quantize, range(self.n_written)))
             
             # Calculate frame duration
             if duration is None:
@@ -224,10 +638,19 @@ class ChartAnimationRecorder:
                 save_all=True,
                 append_images=pil_frames[1:],
                 duration=duration,
-                loop=0,
-                optimize=True
+                loop=0
             )
             
+            if GIFSICLE_PATH:
+                try:
+                    subprocess.run(
+                        [GIFSICLE_PATH, "--batch", "-O3", "--lossy=80", f"-j{os.cpu_count() or 1}", output_path],
+                        check=True,
+                        capture_output=True
+                    )
+                except (subprocess.CalledProcessError, OSError) as e:
+                    print(f"gifsicle optimisation skipped: {e}")
+            
             print(f"GIF saved: {output_path}")
             return True
             
@@ -236,27 +659,29 @@ class ChartAnimationRecorder:
             return False
     
     def save_as_mp4(self, output_path, fps=30):
-        """Save recorded frames as MP4 video"""
-        if not self.frames:
+        """Save recorded frames as MP4 video, or finish the one encoded during capture"""
+        if self._video_writer is not None:
+            writer, self._video_writer = self._video_writer, None
+            try:
+                writer.release()
+            except Exception as e:
+                print(f"Error saving MP4: {e}")
+                return False
+            print(f"MP4 saved: {output_path}")
+            return True
+        
+        if self.n_written == 0:
             print("No frames to save")
             return False
         
         try:
             # Setup video writer
             height, width = self.frames[0].shape[:2]
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+            writer = create_video_writer(output_path, fps, width, height)
             
-            for frame in self.frames:
-                # Convert RGB to BGR for OpenCV
-                if len(frame.shape) == 3 and frame.shape[2] == 3:
-                    bgr_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                elif len(frame.shape) == 3 and frame.shape[2] == 4:
-                    bgr_frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR)
-                else:
-                    bgr_frame = frame
-                
-                writer.write(bgr_frame)
+            for i in range(self.n_written):
+                # Frames are captured as BGR, so they go to the writer as-is
+                writer.write(self.frames[i])
             
             writer.release()
             print(f"MP4 saved: {output_path}")
@@ -268,10 +693,171 @@ class ChartAnimationRecorder:
     
     def cleanup(self):
         """Clean up resources"""
+        self._stop_encoder()
+        if self._video_writer is not None:
+            try:
+                self._video_writer.release()
+            except Exception as e:
+                logger.warning(f"Could not finish video: {e}")
+            self._video_writer = None
         if self.driver:
+            if self._attached:
+                # Close only our tab; quitting a session attached by debuggerAddress
+                # stops chromedriver but leaves the shared browser running
+                try:
+                    self.driver.close()
+                except Exception as e:
+                    logger.warning(f"Could not close recording tab: {e}")
             self.driver.quit()
 
 
+def _capture_frame_slice(base_url, x_columns, y_columns, animation_speed, duration_seconds, fps, worker_index, worker_count, start_barrier):
+    """
+    Worker process body for RecorderPool: open a headless browser and capture every
+    worker_count-th frame starting at worker_index. Workers start their clocks together
+    at start_barrier. Frames are written to a shared memory block; returns
+    (block name, block shape, [(slot, frame_num), ...]).
+    """
+    setup_logging()
+    recorder = ChartAnimationRecorder(base_url, headless=True)
+    block = None
+    try:
+        recorder.setup_driver()
+        recorder.driver.get(base_url)
+        recorder.wait_for_chart_load()
+        if x_columns or y_columns:
+            recorder.setup_animation(x_columns, y_columns, animation_speed)
+        
+        # Browsers start at different speeds; wait until every one is ready so all
+        # workers measure frame deadlines from the same moment
+        start_barrier.wait(timeout=WORKER_START_TIMEOUT)
+        
+        frame_numbers = range(worker_index, int(duration_seconds * fps), worker_count)
+        captured = []
+        shape = None
+        interval_ns = int(1e9 / fps)
+        start_ns = time.monotonic_ns()
+        
+        for slot, frame_num in enumerate(frame_numbers):
+            # Each worker keeps to the shared timeline so interleaved frames line up
+            delay = (start_ns + frame_num * interval_ns - time.monotonic_ns()) / 1e9
+            if delay > 0:
+                time.sleep(delay)
+            
+            frame = recorder.capture_chart_frame()
+            if frame is None:
+                logger.warning(f"Worker {worker_index} failed to capture frame {frame_num + 1}")
+                continue
+            
+            if block is None:
+                shape = frame.shape
+                block = shared_memory.SharedMemory(create=True, size=len(frame_numbers) * frame.nbytes)
+                buffer = np.ndarray((len(frame_numbers),) + shape, dtype=np.uint8, buffer=block.buf)
+            if frame.shape != shape:
+                logger.warning(f"Worker {worker_index} skipped frame {frame_num + 1} with shape {frame.shape}")
+                continue
+            
+            buffer[slot] = frame
+            captured.append((slot, frame_num))
+        
+        if block is None:
+            return None, None, []
+        del buffer
+        block.close()  # The parent process copies the frames out and unlinks the block
+        return block.name, (len(frame_numbers),) + shape, captured
+    except Exception:
+        start_barrier.abort()  # Release workers still waiting for this one
+        if block is not None:
+            block.close()
+            block.unlink()
+        raise
+    finally:
+        recorder.cleanup()
+        # Pool processes exit without running atexit handlers
+        stop_logging()
+
+
+class RecorderPool:
+    """Record one animation with several headless Chrome processes capturing interleaved frames"""
+    
+    def __init__(self, base_url="http://localhost:5174", workers=2):
+        self.base_url = base_url
+        self.workers = workers
+    
+    def record(self, duration_seconds=10, fps=30, x_columns=None, y_columns=None, animation_speed=2):
+        """Capture the animation and return its frames in order"""
+        logger.info(f"Recording with {self.workers} browser workers...")
+        
+        # Start the resource tracker before the workers so they share it; otherwise a
+        # worker's own tracker unlinks its frame block as soon as the worker exits
+        resource_tracker.ensure_running()
+        with Manager() as manager, ProcessPoolExecutor(max_workers=self.workers) as executor:
+            start_barrier = manager.Barrier(self.workers)
+            futures = [
+                executor.submit(
+                    _capture_frame_slice, self.base_url, x_columns, y_columns, animation_speed,
+                    duration_seconds, fps, worker_index, self.workers, start_barrier
+                )
+                for worker_index in range(self.workers)
+            ]
+            results = []
+            error = None
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    error = error or e
+        
+        results = [result for result in results if result[0] is not None]
+        try:
+            if error is not None:
+                raise error
+            if not results:
+                return []
+            return self._gather_frames(results)
+        finally:
+            # Free every worker's block, including those of workers that finished
+            # before another one failed
+            for name, _, _ in results:
+                try:
+                    block = shared_memory.SharedMemory(name=name)
+                except FileNotFoundError:
+                    continue
+                block.close()
+                block.unlink()
+    
+    @staticmethod
+    def _gather_frames(results):
+        """
+        Copy every worker's frames straight into one contiguous, time-ordered array,
+        so saving iterates views instead of stacking a list afterwards
+        """
+        frame_shape = results[0][1][1:]
+        order = sorted(
+            (frame_num, index, slot)
+            for index, (_, shape, captured) in enumerate(results)
+            if shape[1:] == frame_shape
+            for slot, frame_num in captured
+        )
+        frames = np.empty((len(order),) + frame_shape, dtype=np.uint8)
+        position = {(index, slot): i for i, (_, index, slot) in enumerate(order)}
+        for index, (name, shape, captured) in enumerate(results):
+            if shape[1:] != frame_shape:
+                logger.warning(f"Dropping worker frames sized {shape[1:]}, expected {frame_shape}")
+                continue
+            block = shared_memory.SharedMemory(name=name)
+            try:
+                buffer = np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+                for slot, _ in captured:
+                    frames[position[index, slot]] = buffer[slot]
+                del buffer
+            finally:
+                block.close()
+        
+        logger.info(f"Captured {len(frames)} frames total")
+        return frames
+
+
 def main():
     parser = argparse.ArgumentParser(description="Record chart animations")
     parser.add_argument("--url", default="http://localhost:5174", help="Base URL of the application")
@@ -283,6 +869,9 @@ def main():
     parser.add_argument("--x-columns", nargs="+", help="X-axis columns for animation")
     parser.add_argument("--y-columns", nargs="+", help="Y-axis columns for animation")
     parser.add_argument("--speed", type=float, default=2.0, help="Animation speed (seconds per frame)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of headless browsers capturing frames in parallel")
+    parser.add_argument("--reuse-browser", action="store_true", help="Record in a new tab of a long-lived Chrome, starting it if needed")
+    parser.add_argument("--debugger-address", default=DEBUGGER_ADDRESS, help="Remote debugging address of the Chrome used by --reuse-browser")
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
     
     args = parser.parse_args()
@@ -296,45 +885,77 @@ def main():
     recorder = ChartAnimationRecorder(args.url, args.headless)
     
     try:
-        logger.info("Setting up browser...")
-        print("Setting up browser...")
-        recorder.setup_driver()
-        
-        logger.info(f"Loading chart from {args.url}...")
-        print(f"Loading chart from {args.url}...")
-        recorder.driver.get(args.url)
-        
-        # Log current URL and title for debugging
-        logger.info(f"Current URL: {recorder.driver.current_url}")
-        logger.info(f"Page title: {recorder.driver.title}")
-        
-        if not recorder.wait_for_chart_load():
-            logger.error("Failed to load chart")
-            print("Failed to load chart")
-            return 1
-        
-        if args.x_columns or args.y_columns:
-            logger.info("Configuring animation...")
-            print("Configuring animation...")
-            recorder.setup_animation(args.x_columns, args.y_columns, args.speed)
-        
-        logger.info("Starting recording...")
-        print("Starting recording...")
-        if not recorder.record_animation(args.duration, args.fps):
-            logger.error("Failed to record animation")
-            print("Failed to record animation")
-            return 1
+        if args.workers > 1:
+            # Each worker opens its own headless browser, so this process needs none
+            print(f"Recording with {args.workers} browsers...")
+            recorder.frames = RecorderPool(args.url, args.workers).record(
+                args.duration, args.fps, args.x_columns, args.y_columns, args.speed
+            )
+            recorder.n_written = len(recorder.frames)
+            if not recorder.n_written:
+                logger.error("Failed to record animation")
+                print("Failed to record animation")
+                return 1
+        else:
+            logger.info("Setting up browser...")
+            print("Setting up browser...")
+            if args.reuse_browser:
+                if not launch_debug_browser(args.debugger_address, args.headless):
+                    print("Failed to start a browser to reuse")
+                    return 1
+                recorder.attach(args.debugger_address)
+            else:
+                recorder.setup_driver()
+            
+            logger.info(f"Loading chart from {args.url}...")
+            print(f"Loading chart from {args.url}...")
+            recorder.driver.get(args.url)
+            
+            # Log current URL and title for debugging
+            logger.info(f"Current URL: {recorder.driver.current_url}")
+            logger.info(f"Page title: {recorder.driver.title}")
+            
+            if not recorder.wait_for_chart_load():
+                logger.error("Failed to load chart")
+                print("Failed to load chart")
+                return 1
+            
+            if args.x_columns or args.y_columns:
+                logger.info("Configuring animation...")
+                print("Configuring animation...")
+                recorder.setup_animation(args.x_columns, args.y_columns, args.speed)
+            
+            logger.info("Starting recording...")
+            print("Starting recording...")
+            # MP4 output is encoded while capturing; frames are only kept for a GIF
+            video_path = f"{args.output}.mp4" if args.format in ["mp4", "both"] else None
+            keep_frames = args.format in ["gif", "both"]
+            if not recorder.record_animation(args.duration, args.fps, video_path, keep_frames):
+                logger.error("Failed to record animation")
+                print("Failed to record animation")
+                return 1
         
         # Save in requested format(s)
+        saved = True
         if args.format in ["gif", "both"]:
             gif_path = f"{args.output}.gif"
-            logger.info(f"Saving GIF to {gif_path}...")
-            recorder.save_as_gif(gif_path, duration=int(1000/args.fps))
+            if recorder.frames_dropped:
+                logger.error(f"Skipped {gif_path}: not enough memory to keep the frames")
+                print(f"GIF skipped: not enough memory to keep frames for {gif_path}")
+                saved = False
+            else:
+                logger.info(f"Saving GIF to {gif_path}...")
+                saved = recorder.save_as_gif(gif_path, duration=int(1000/args.fps))
         
         if args.format in ["mp4", "both"]:
             mp4_path = f"{args.output}.mp4"
             logger.info(f"Saving MP4 to {mp4_path}...")
-            recorder.save_as_mp4(mp4_path, args.fps)
+            saved = recorder.save_as_mp4(mp4_path, args.fps) and saved
+        
+        if not saved:
+            logger.error("Recording finished without every requested output")
+            print("Recording finished without every requested output")
+            return 1
         
         logger.info("Recording completed successfully!")
         print("Recording completed successfully!")
@@ -351,5 +972,4 @@ def main():
 
 
 if __name__ == "__main__":
-    import io
     sys.exit(main())
@@ -24,10 +24,6 @@ def test_imports():
         import numpy as np
         print(f" ({np.__version__})")
         
-        print("  ✓ imageio", end="")
-        import imageio
-        print(f" ({imageio.__version__})")
-        
         print("\n✅ All dependencies are installed correctly!")
         return True
         
@@ -6,7 +6,7 @@ import ChartControls from './components/ChartControls'
 import DataManager from './components/DataManager'
 import type { DataPoint, ChartConfig } from './types'
 import axios from 'axios'
-import { binData, shouldUseBinning } from './utils/dataUtils'
+import { binData, shouldUseBinning, columnsToRows } from './utils/dataUtils'
 
 const API_BASE_URL = 'http://localhost:8000'
 
@@ -91,6 +91,16 @@ function App() {
     fetchColumns()
   }, [])
 
+  // Let the backend recorder push frame configs straight into chart state
+  useEffect(() => {
+    window.__applyFrameConfig = (frameConfig: Partial<ChartConfig>) => {
+      setChartConfig((prev: ChartConfig) => ({ ...prev, ...frameConfig }))
+    }
+    return () => {
+      delete window.__applyFrameConfig
+    }
+  }, [])
+
   // Update chart config when columns change
   useEffect(() => {
     if (columns.length > 0) {
@@ -106,6 +116,11 @@ function App() {
     }
   }, [columns])
 
+  // Tell the backend recorder the dataset is available
+  useEffect(() => {
+    window.__dataReady = columns.length > 0
+  }, [columns])
+
   // Fetch data when view mode changes or when columns are first loaded
   useEffect(() => {
     if (columns.length > 0) {
@@ -209,9 +224,10 @@ function App() {
     setLoading(true)
     setError(null)
     try {
-      const response = await axios.get(`${API_BASE_URL}/data/table`)
-      setData(response.data.data)
-      setRawData(response.data.data) // Also store as raw data
+      const response = await axios.get(`${API_BASE_URL}/data/table`, { params: { columnar: true } })
+      const rows = columnsToRows(response.data.data)
+      setData(rows as DataPoint[])
+      setRawData(rows) // Also store as raw data
     } catch (err) {
       const errorMsg = axios.isAxiosError(err) 
         ? `Failed to fetch table data: ${err.message}` 
@@ -227,10 +243,11 @@ function App() {
     setLoading(true)
     setError(null)
     try {
-      const response = await axios.get(`${API_BASE_URL}/data/table`)
-      setRawData(response.data.data)
+      const response = await axios.get(`${API_BASE_URL}/data/table`, { params: { columnar: true } })
+      const rows = columnsToRows(response.data.data)
+      setRawData(rows)
       // Transform immediately for chart view
-      const transformedData = transformDataForChart(response.data.data, chartConfig)
+      const transformedData = transformDataForChart(rows, chartConfig)
       setData(transformedData)
     } catch (err) {
       const errorMsg = axios.isAxiosError(err) 
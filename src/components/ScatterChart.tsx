@@ -1,4 +1,4 @@
-import React from 'react'
+import React, { useLayoutEffect } from 'react'
 import { 
   ScatterChart as RechartsScatter, 
   Scatter, 
@@ -10,6 +10,7 @@ import {
   Legend
 } from 'recharts'
 import type { DataPoint, ChartConfig } from '../types'
+import { beginChartRender, finishChartRender } from '../utils/chartReady'
 
 interface ScatterChartProps {
   data: DataPoint[]
@@ -22,6 +23,11 @@ const COLORS = [
 ]
 
 const ScatterChart: React.FC<ScatterChartProps> = ({ data, config }) => {
+  const transitionMs = config.transition_duration || config.animation_duration || 800
+
+  // Let browser automation wait for this render instead of sleeping
+  useLayoutEffect(() => beginChartRender(transitionMs), [data, config, transitionMs])
+
   // Group data by category if category column is specified
   const groupedData = data.reduce((acc, point) => {
     const category = config.category_column ? point.category || 'Unknown' : 'All Data'
@@ -128,8 +134,9 @@ const ScatterChart: React.FC<ScatterChartProps> = ({ data, config }) => {
               name={category}
               data={groupedData[category]}
               fill={COLORS[index % COLORS.length]}
-              animationDuration={config.transition_duration || config.animation_duration || 800}
+              animationDuration={transitionMs}
               animationEasing="ease-out"
+              onAnimationEnd={finishChartRender}
               shape={(props: any) => {
                 const { cx, cy, payload } = props
                 const minSize = config.size_min || 3
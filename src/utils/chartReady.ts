@@ -0,0 +1,47 @@
+// Render-completion signal polled by the backend browser automation
+// (backend/browser_automation.py) in place of fixed sleeps.
+
+import type { ChartConfig } from '../types'
+
+export interface ChartReadySignal {
+  done: boolean
+  promise: Promise<void>
+}
+
+declare global {
+  interface Window {
+    __chartReady?: ChartReadySignal
+    // Registered by App so the recorder can apply frame configs without DOM fallbacks
+    __applyFrameConfig?: (frameConfig: Partial<ChartConfig>) => void
+    // Set by App once the backend dataset's columns have been fetched
+    __dataReady?: boolean
+  }
+}
+
+let resolveCurrent: (() => void) | null = null
+
+// Mark the chart as re-rendering; it is reported ready when the transition
+// ends, or after settleMs if Recharts never fires its animation callback.
+export function beginChartRender(settleMs: number): () => void {
+  let resolve!: () => void
+  const signal: ChartReadySignal = {
+    done: false,
+    promise: new Promise<void>(r => { resolve = () => r() })
+  }
+  const finish = () => {
+    if (!signal.done) {
+      signal.done = true
+      resolve()
+    }
+  }
+
+  window.__chartReady = signal
+  resolveCurrent = finish
+  const timer = setTimeout(() => requestAnimationFrame(finish), settleMs)
+
+  return () => clearTimeout(timer)
+}
+
+export function finishChartRender() {
+  resolveCurrent?.()
+}
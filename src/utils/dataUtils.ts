@@ -80,3 +80,20 @@ export function shouldUseBinning(
   const columnInfo = columns.find(col => col.name === categoryColumn)
   return columnInfo?.is_numeric || false
 }
+
+// Rebuild row objects from a column-oriented payload ({ column: values[] })
+export function columnsToRows(columns: Record<string, any[]>): Record<string, any>[] {
+  const names = Object.keys(columns)
+  const rowCount = names.length > 0 ? columns[names[0]].length : 0
+  const rows: Record<string, any>[] = new Array(rowCount)
+  
+  for (let i = 0; i < rowCount; i++) {
+    const row: Record<string, any> = {}
+    for (const name of names) {
+      row[name] = columns[name][i]
+    }
+    rows[i] = row
+  }
+  
+  return rows
+}